@@ -1,8 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
 
-from src.core.agent import BaseAgent, AgentConfig
+from src.core.agent import BaseAgent, AgentConfig, LLMAgent, _load_system_prompt_from_config
 from src.core.types import Message, Result
 
 
@@ -36,7 +37,9 @@ class FanOutAgent(BaseAgent):
     }
 
     Saída: dict { "<next_node>": <payload para aquele nó> }
-    Se nenhum payload específico for informado, replica a entrada para todos os ramos.
+    Se nenhum payload específico for informado, replica a entrada para todos os ramos
+    (o mesmo objeto), de modo que o conteúdo 'user' enviado ao LLM é idêntico em todos
+    eles e o cache de prompt do Ollama pode ser reaproveitado (ver keep_alive no LLMAgent).
     Automatically converts message format to user_prompt format for LLMAgent compatibility.
     """
     def run(self, message: Message) -> Result:
@@ -52,3 +55,43 @@ class FanOutAgent(BaseAgent):
         out: Dict[str, Any] = {b: converted_data for b in branches}
         disp = f"↗️ FanOut -> {', '.join(branches)}"
         return Result.ok(output=out, display_output=disp)
+
+
+class FanOutDispatcher:
+    """
+    Ordena os ramos de um fan-out para aproveitar o cache do Ollama.
+
+    Ramos com a mesma chave (modelo, hash do prefixo estático do system prompt)
+    são executados em sequência, e o grupo cuja chave foi a última despachada
+    vai primeiro: o modelo já está carregado e o prefixo ainda está no cache,
+    evitando troca de modelo e prefill repetido entre ramos.
+
+    Uso: WorkflowManager(graph, agents, dispatcher=FanOutDispatcher())
+    """
+    def __init__(self):
+        self._last_key: Optional[Tuple[Optional[str], Optional[str]]] = None
+
+    @staticmethod
+    def branch_key(agent: Optional[BaseAgent]) -> Tuple[Optional[str], Optional[str]]:
+        if not isinstance(agent, LLMAgent):
+            return (None, None)
+        model = (agent.config.model_config or {}).get("model")
+        try:
+            prompt = _load_system_prompt_from_config(agent.config)
+        except FileNotFoundError:
+            return (model, None)
+        # prefixo estático = tudo antes do primeiro placeholder {var}
+        prefix = prompt.split("{", 1)[0]
+        return (model, hashlib.sha1(prefix.encode("utf-8")).hexdigest())
+
+    def order(self, branches: List[str], agents: Dict[str, BaseAgent]) -> List[str]:
+        groups: Dict[Tuple[Optional[str], Optional[str]], List[str]] = {}
+        for b in branches:
+            groups.setdefault(self.branch_key(agents.get(b)), []).append(b)
+        keys = list(groups)
+        if self._last_key in groups:
+            keys.remove(self._last_key)
+            keys.insert(0, self._last_key)
+        if keys:
+            self._last_key = keys[-1]
+        return [b for k in keys for b in groups[k]]
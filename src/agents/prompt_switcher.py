@@ -1,8 +1,8 @@
 from __future__ import annotations
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import re
 
-from src.core.agent import BaseAgent, AgentConfig, LLMAgent
+from src.core.agent import BaseAgent, AgentConfig, LLMAgent, _load_system_prompt_from_config
 from src.core.types import Message, Result
 
 # -------- Parsers de Markdown --------
@@ -15,6 +15,37 @@ _PLAN = re.compile(
     re.IGNORECASE | re.MULTILINE | re.DOTALL
 )
 
+_SWITCH_RULES = re.compile(
+    r"^###\s*SWITCH\s+RULES\s*\n(?P<body>.*?)(?=^\s*###\s+|\Z)",
+    re.IGNORECASE | re.MULTILINE | re.DOTALL
+)
+# "- If the input contains [[PARAGRAPH]], choose Writer → writer_paragraph.md."
+_RULE = re.compile(
+    r"contains\s+(?P<trigger>\[\[[^\]]+\]\])\s*,\s*choose\s+(?P<agent>[\w\-]+)\s*(?:→|->)\s*(?P<file>[\w./\-]+?\.md)",
+    re.IGNORECASE
+)
+
+def _parse_switch_rules(md: str) -> List[Tuple[str, str, str]]:
+    """
+    Regras com gatilho literal da seção ### SWITCH RULES, na ordem do prompt.
+    Retorna: [('[[PARAGRAPH]]', 'Writer', 'writer_paragraph.md'), ...]
+    ("Otherwise ..." não tem gatilho e fica a cargo do LLM.)
+    """
+    m = _SWITCH_RULES.search(md or "")
+    if not m:
+        return []
+    return [(r.group("trigger"), r.group("agent"), r.group("file")) for r in _RULE.finditer(m.group("body"))]
+
+def _compile_decide(rules: List[Tuple[str, str, str]]) -> Callable[[str], Dict[str, str]]:
+    """Tabela de regras fixa -> função de decisão (primeira regra cujo gatilho aparece no texto)."""
+    rules = tuple(rules)
+    def decide(text: str) -> Dict[str, str]:
+        for trigger, agent_name, file_name in rules:
+            if trigger in text:
+                return {agent_name: file_name}
+        return {}
+    return decide
+
 def _parse_target_prompts(md: str) -> Dict[str, str]:
     """
     Lê linhas tipo:
@@ -56,15 +87,46 @@ class PromptSwitcherAgent(BaseAgent):
     {
       "prompt_file": "prompt_switcher.md",    # REQUIRED
       "model": "...", "options": {...},
-      "default_targets": {"Writer": "writer_bullets.md"}  # fallback
+      "default_targets": {"Writer": "writer_bullets.md"},  # fallback
+      "fast_path": False                      # True: decide trigger rules without the LLM
     }
 
+    Fast path (opt-in): the prompt's ### SWITCH RULES ("If the input contains
+    [[X]], choose Agent → file.md") are compiled into a decision function,
+    recompiled whenever the prompt file changes on disk. When a trigger
+    matches and the prompt does not ask for a ### PLAN, the LLM call is skipped.
+
     Output:
       overrides["for"] = { "<Agent>": {"prompt_file": "<file.md>"} }
       output[<Agent>]   = { "plan_md": "<markdown>" }   # payload per branch (if plan found)
     """
     def __init__(self, config: AgentConfig):
         super().__init__(config)
+        # texto do prompt -> função de decisão compilada a partir dele
+        self._decide_src: Optional[str] = None
+        self._decide_fn: Optional[Callable[[str], Dict[str, str]]] = None
+
+    @property
+    def _decide(self) -> Optional[Callable[[str], Dict[str, str]]]:
+        mc = self.config.model_config or {}
+        if not mc.get("fast_path", False) or not mc.get("prompt_file"):
+            return None
+        try:
+            # _PROMPT_CACHE relê o arquivo quando mtime/tamanho mudam
+            prompt = _load_system_prompt_from_config(AgentConfig(name=self.config.name, prompt_file=mc["prompt_file"]))
+        except FileNotFoundError:
+            return None
+        if prompt is not self._decide_src:
+            self._decide_src, self._decide_fn = prompt, self._compile_rules(prompt)
+        return self._decide_fn
+
+    @staticmethod
+    def _compile_rules(prompt: str) -> Optional[Callable[[str], Dict[str, str]]]:
+        # Prompts de handoff também pedem um PLAN: só o LLM consegue gerá-lo
+        if _PLAN.search(prompt):
+            return None
+        rules = _parse_switch_rules(prompt)
+        return _compile_decide(rules) if rules else None
 
     def _extract_text(self, data: Any) -> str:
         if isinstance(data, dict):
@@ -80,16 +142,20 @@ class PromptSwitcherAgent(BaseAgent):
         if not prompt_file:
             raise ValueError("PromptSwitcherAgent requires model_config['prompt_file'] (e.g., 'prompt_switcher.md').")
 
-        # Use LLMAgent to generate the Markdown decision
-        llm = LLMAgent(AgentConfig(
-            name=f"{self.config.name}::LLM",
-            prompt_file=prompt_file,
-            model_config=mc
-        ))
         text = self._extract_text(message.data)
-        # Create message compatible with new LLMAgent interface
-        llm_message = Message(data={"user_prompt": text})
-        md = llm.execute(llm_message).output.get("text", "")
+        decide = self._decide
+        decided = decide(text) if decide else {}
+        md = "".join(["### TARGET PROMPTS\n"] + [f"- {a}: {f}\n" for a, f in decided.items()]) if decided else ""
+        if not md:
+            # Use LLMAgent to generate the Markdown decision
+            llm = LLMAgent(AgentConfig(
+                name=f"{self.config.name}::LLM",
+                prompt_file=prompt_file,
+                model_config=mc
+            ))
+            # Create message compatible with new LLMAgent interface
+            llm_message = Message(data={"user_prompt": text})
+            md = llm.execute(llm_message).output.get("text", "")
 
         targets = _parse_target_prompts(md)
         if not targets:
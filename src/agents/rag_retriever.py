@@ -18,16 +18,31 @@ class RAGRetrieverAgent(BaseAgent):
     """
     Recupera contextos do Qdrant (via MemoryManager) e devolve markdown pronto.
     model_config: {"top_k": int}
+    run_batch(messages): várias consultas numa única busca em lote no Qdrant.
     """
     def __init__(self, config: AgentConfig, memory: MemoryManager):
         super().__init__(config)
         self.memory = memory
 
-    def run(self, message: Message) -> Result:
+    def _top_k(self) -> int:
         mc=self.config.model_config or {}
-        top_k=int(mc.get("top_k",5))
-        query = message.get("query") or message.get("text") or str(message.data)
-        snips=self.memory.search_context(query, top_k=top_k)
+        return int(mc.get("top_k",5))
+
+    @staticmethod
+    def _query(message: Message) -> str:
+        return message.get("query") or message.get("text") or str(message.data)
+
+    def run(self, message: Message) -> Result:
+        query = self._query(message)
+        snips=self.memory.search_context(query, top_k=self._top_k())
+        return self._result(message, query, snips)
+
+    def run_batch(self, messages: List[Message]) -> List[Result]:
+        queries=[self._query(m) for m in messages]
+        batches=self.memory.search_contexts(queries, top_k=self._top_k())
+        return [self._result(m, q, snips) for m, q, snips in zip(messages, queries, batches)]
+
+    def _result(self, message: Message, query: str, snips: List[Dict[str,Any]]) -> Result:
         ctx_md=_md_context(snips)
         disp=f"📚 RAG: retrieved {len(snips)} snippets"
         
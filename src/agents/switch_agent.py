@@ -4,6 +4,12 @@ from typing import Any, Dict, List, Optional, Tuple
 import json
 import re
 
+try:
+    import ahocorasick  # pyahocorasick (opcional)
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 from src.core.agent import BaseAgent, AgentConfig, LLMAgent
 from src.core.types import Message, Result
 
@@ -37,6 +43,45 @@ def _score_keywords(text: str, keywords: List[str]) -> int:
     return score
 
 
+# "## Item 3" abre a seção do 3º texto em classify_batch
+_ITEM_HEADER = re.compile(r"^\s*##\s*Item\s+(\d+)\s*$", re.IGNORECASE | re.MULTILINE)
+
+
+class _KeywordMatcher:
+    """
+    Compilado uma vez por conjunto de keywords: uma única passada no texto
+    devolve todas as keywords presentes (mesma semântica de _score_keywords).
+    Usa pyahocorasick se instalado; senão, uma união de regex.
+    """
+    def __init__(self, keywords: List[str]):
+        kws = sorted({k.casefold() for k in keywords if k}, key=len, reverse=True)
+        self._ac = None
+        self._re = None
+        # keywords contidas numa maior: se a maior casa, elas também casam (caminho regex)
+        self._implied = {k: {o for o in kws if o != k and o in k} for k in kws}
+        if not kws:
+            return
+        if AHOCORASICK_AVAILABLE:
+            self._ac = ahocorasick.Automaton()
+            for k in kws:
+                self._ac.add_word(k, k)
+            self._ac.make_automaton()
+        else:
+            # lookahead: testa todas as posições; alternativas mais longas primeiro
+            self._re = re.compile("(?=(" + "|".join(map(re.escape, kws)) + "))")
+
+    def hits(self, text: str) -> set:
+        t = text.casefold()
+        if self._ac is not None:
+            return {k for _, k in self._ac.iter(t)}
+        if self._re is None:
+            return set()
+        found = {m.group(1) for m in self._re.finditer(t)}
+        for k in list(found):
+            found |= self._implied[k]
+        return found
+
+
 def _parse_markdown_response(response: str) -> Optional[Dict[str, Any]]:
     """
     Parse markdown-formatted response from LLM instead of JSON.
@@ -106,19 +151,48 @@ class SwitchAgent(BaseAgent):
     LLM:
       - Injete via __init__(..., llm_fn=callable) se quiser usar Ollama/OpenAI.
       - Caso não fornecido, o LLM vira um stub que devolve a primeira rota (apenas para dev).
+
+    route_cache (opcional): SemanticCache (src/memory/semantic_cache.py). Textos
+    semanticamente próximos de um já roteado pelo LLM (mesmas rotas) reutilizam a
+    decisão sem nova chamada ao LLM.
     """
 
-    def __init__(self, config: AgentConfig):
+    def __init__(self, config: AgentConfig, route_cache: Optional[Any] = None):
         super().__init__(config)
+        self.route_cache = route_cache
         # Create internal LLMAgent for consistent Ollama integration
         self.llm_agent = LLMAgent(config)
+        # (keywords por rota, _KeywordMatcher) — recompila só se as rotas mudarem
+        self._kw_matcher: Optional[Tuple[Tuple, _KeywordMatcher]] = None
 
     # ------------------------ API principal ----------------------------
 
     def run(self, message: Message) -> Result:
         cfg = self._read_config()
         user_text = _extract_text(message.data)
+        llm_choice = self._route_with_llm(user_text, cfg) if cfg["mode"] in ("llm", "hybrid") else None
+        return self._emit(*self._decide(user_text, cfg, llm_choice))
 
+    def classify_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Roteia vários textos com UMA chamada ao LLM (modos llm/hybrid) em vez de uma por texto.
+        Retorna, por texto, o mesmo dict de output de run(): {route, mode, confidence, details}.
+        Itens ausentes/ilegíveis na resposta seguem o mesmo fallback de run() (keywords/default).
+        """
+        cfg = self._read_config()
+        if cfg["mode"] in ("llm", "hybrid"):
+            llm_choices = self._route_batch_with_llm(texts, cfg)
+        else:
+            llm_choices = [None] * len(texts)
+        out = []
+        for text, llm_choice in zip(texts, llm_choices):
+            route, used_mode, confidence, details = self._decide(text, cfg, llm_choice)
+            out.append({"route": route or "", "mode": used_mode, "confidence": confidence, "details": details})
+        return out
+
+    def _decide(self, text: str, cfg: Dict[str, Any],
+                llm_choice: Optional[Tuple[Optional[str], float, Dict[str, Any]]]
+                ) -> Tuple[Optional[str], str, float, Dict[str, Any]]:
         # 1) Decide modo
         mode = cfg["mode"]
         chosen: Optional[str] = None
@@ -127,21 +201,21 @@ class SwitchAgent(BaseAgent):
         details: Dict[str, Any] = {}
 
         if mode in ("llm", "hybrid"):
-            chosen, confidence, details = self._route_with_llm(user_text, cfg)
+            chosen, confidence, details = llm_choice or (None, 0.0, {})
             if chosen and chosen in cfg["routes"] and confidence >= cfg["confidence_threshold"]:
-                return self._emit(chosen, used_mode, confidence, details)
+                return chosen, used_mode, confidence, details
 
             # fallback para keywords
             if mode == "hybrid":
                 used_mode = "keywords"
 
         if mode == "keywords" or used_mode == "keywords":
-            chosen, kw_scores = self._route_with_keywords(user_text, cfg)
+            chosen, kw_scores = self._route_with_keywords(text, cfg)
             details.update({"keyword_scores": kw_scores})
             if not chosen:
                 chosen = cfg["default"]
 
-        return self._emit(chosen, used_mode, confidence, details)
+        return chosen, used_mode, confidence, details
 
     # ------------------------ Métodos internos -------------------------
 
@@ -187,11 +261,18 @@ class SwitchAgent(BaseAgent):
             "prompt_file": prompt_file
         }
 
+    def _matcher_for(self, cfg: Dict[str, Any]) -> _KeywordMatcher:
+        key = tuple((label, tuple(spec.get("keywords", []) or [])) for label, spec in cfg["routes"].items())
+        if self._kw_matcher is None or self._kw_matcher[0] != key:
+            self._kw_matcher = (key, _KeywordMatcher([kw for _, kws in key for kw in kws]))
+        return self._kw_matcher[1]
+
     def _route_with_keywords(self, text: str, cfg: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, int]]:
+        hits = self._matcher_for(cfg).hits(text)
         scores: Dict[str, int] = {}
         for label, spec in cfg["routes"].items():
             kws = spec.get("keywords", []) or []
-            scores[label] = _score_keywords(text, kws)
+            scores[label] = sum(1 for kw in kws if kw and kw.casefold() in hits)
         # escolhe o maior score; em empate, prioriza ordem de definição
         best = None
         best_score = -1
@@ -204,20 +285,91 @@ class SwitchAgent(BaseAgent):
             return None, scores
         return best, scores
 
+    @staticmethod
+    def _route_options(cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            {"label": label,
+             "description": spec.get("description", "") or "",
+             "keywords": spec.get("keywords", []) or []}
+            for label, spec in cfg["routes"].items()
+        ]
+
+    def _route_batch_with_llm(self, texts: List[str], cfg: Dict[str, Any]
+                              ) -> List[Optional[Tuple[Optional[str], float, Dict[str, Any]]]]:
+        """
+        Um único prompt com todos os textos numerados; resposta em markdown, uma seção por item:
+        ## Item N / ## Route: ... / ## Confidence: ... / ## Reasons: ...
+        """
+        numbered = "\n".join(f"{i}. {t}" for i, t in enumerate(texts, start=1))
+        user_prompt = f"""Route each numbered text independently.
+
+Texts:
+{numbered}
+
+Available routes:
+{json.dumps(self._route_options(cfg), ensure_ascii=False, indent=2)}
+
+For EACH text, answer with one section in this markdown format:
+## Item [number]
+## Route: [route_name]
+## Confidence: [0.0-1.0]
+## Reasons: [brief explanation]"""
+
+        try:
+            llm_result = self.llm_agent.run(Message(data={"user_prompt": user_prompt}))
+            if not llm_result.success:
+                err = {"llm_error": f"LLM call failed: {llm_result.output}"}
+                return [(None, 0.0, dict(err)) for _ in texts]
+            llm_raw = llm_result.output.get("text", "") or ""
+        except Exception as e:
+            return [(None, 0.0, {"llm_error": str(e)}) for _ in texts]
+
+        sections: Dict[int, str] = {}
+        parts = _ITEM_HEADER.split(llm_raw)
+        # parts = [prefixo, num1, corpo1, num2, corpo2, ...]
+        for num, body in zip(parts[1::2], parts[2::2]):
+            sections.setdefault(int(num), body)
+
+        choices: List[Optional[Tuple[Optional[str], float, Dict[str, Any]]]] = []
+        for i in range(1, len(texts) + 1):
+            parsed = _parse_markdown_response(sections.get(i, ""))
+            if not parsed:
+                choices.append((None, 0.0, {"llm_raw": llm_raw, "parse": "failed"}))
+                continue
+            route = parsed.get("route")
+            conf = float(parsed.get("confidence", 0.0) or 0.0)
+            choices.append((route, conf, {"parsed": {"route": route, "confidence": conf,
+                                                     "reasons": parsed.get("reasons", "")}}))
+        return choices
+
     def _route_with_llm(self, text: str, cfg: Dict[str, Any]) -> Tuple[Optional[str], float, Dict[str, Any]]:
+        if self.route_cache is None:
+            return self._ask_llm(text, cfg)
+
+        # namespace = tabela de rotas: a mesma frase com outras rotas é outra decisão
+        namespace = json.dumps(self._route_options(cfg), sort_keys=True, ensure_ascii=False)
+        try:
+            vec = self.route_cache.embed(text)
+            hit, sim = self.route_cache.lookup(namespace, vec)
+        except Exception:
+            # embedder indisponível: segue sem cache
+            return self._ask_llm(text, cfg)
+        if hit is not None:
+            return hit["route"], hit["confidence"], {"cache": "hit", "similarity": sim}
+
+        route, conf, details = self._ask_llm(text, cfg)
+        if route in cfg["routes"]:
+            self.route_cache.add(namespace, vec, {"route": route, "confidence": conf})
+        return route, conf, details
+
+    def _ask_llm(self, text: str, cfg: Dict[str, Any]) -> Tuple[Optional[str], float, Dict[str, Any]]:
         """
         Builds a classification prompt and requests an LLM markdown output:
         ## Route: [route_name]
         ## Confidence: [0.0-1.0]  
         ## Reasons: [brief explanation]
         """
-        options = []
-        for label, spec in cfg["routes"].items():
-            options.append({
-                "label": label,
-                "description": spec.get("description", "") or "",
-                "keywords": spec.get("keywords", []) or []
-            })
+        options = self._route_options(cfg)
 
         # Build user prompt with routing options context
         user_prompt = f"""Text to route: {text}
@@ -235,13 +235,8 @@ class ToolRunnerAgent(BaseAgent):
 
         if action == "scrape":
             urls = _require_list_of_str(args, "urls")
-            out = []
-            for i, u in enumerate(urls, 1):
-                out.append(scraper.load_url(u))
-                if i < len(urls) and delay > 0:
-                    import time as _t
-                    _t.sleep(delay)
-            return out
+            contents = scraper.extract_many(urls)
+            return [{"url": u, "content": c or "Failed to extract content"} for u, c in zip(urls, contents)]
 
         if action == "load_url":
             url = _require_str(args, "url")
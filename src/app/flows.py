@@ -91,7 +91,10 @@ class FlowBuilder:
         return self.agents, self.graph
 
     def manager(self, metrics: Optional[Any] = None) -> WorkflowManager:
-        return WorkflowManager(self.graph, self.agents, metrics=metrics)
+        # cópia do grafo: o WorkflowManager congela arestas/sinks na construção, então
+        # add()/connect() posteriores no builder não podem alterar um manager já criado
+        graph = {node: list(targets) for node, targets in self.graph.items()}
+        return WorkflowManager(graph, self.agents, metrics=metrics)
 
 
 # ---------------------------
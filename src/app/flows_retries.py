@@ -144,7 +144,7 @@ class FlowBundle:
 
     def manager(self, metrics: Optional[MetricsCollector] = None) -> WorkflowManager:
         return WorkflowManager(
-            graph=self.graph,
+            graph={node: list(targets) for node, targets in self.graph.items()},
             agents=self.agents,
             metrics=metrics,
             node_policies=self.node_policies
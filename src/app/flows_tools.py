@@ -15,7 +15,8 @@ class FlowBundle:
     node_policies: Dict[str, Dict[str, object]]
 
     def manager(self) -> WorkflowManager:
-        return WorkflowManager(self.graph, self.agents, metrics=None, node_policies=self.node_policies)
+        graph = {node: list(targets) for node, targets in self.graph.items()}
+        return WorkflowManager(graph, self.agents, metrics=None, node_policies=self.node_policies)
 
 
 def make_duckduckgo_tool_flow() -> FlowBundle:
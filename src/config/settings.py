@@ -18,6 +18,15 @@ def _env_float(name: str, default: float) -> float:
     except (ValueError, TypeError):
         return default
 
+def _env_int(name: str, default: int) -> int:
+    v = os.environ.get(name)
+    if v is None:
+        return default
+    try:
+        return int(v)
+    except (ValueError, TypeError):
+        return default
+
 @dataclass(frozen=True)
 class Settings:
     # LLM
@@ -35,6 +44,8 @@ class Settings:
     # Memory/RAG (quando aplicável)
     qdrant_url: str = field(default="http://localhost:6333")
     qdrant_api_key: Optional[str] = field(default=None)
+    qdrant_prefer_grpc: bool = field(default=False)
+    qdrant_grpc_port: int = field(default=6334)
     mongo_uri: str = field(default="mongodb://localhost:27017")
     mongo_db: str = field(default="app")
 
@@ -61,6 +72,8 @@ class Settings:
             prompt_dir=os.environ.get("PROMPT_DIR", "prompts"),
             qdrant_url=os.environ.get("QDRANT_URL", "http://localhost:6333"),
             qdrant_api_key=os.environ.get("QDRANT_API_KEY"),
+            qdrant_prefer_grpc=_env_bool("QDRANT_PREFER_GRPC", False),
+            qdrant_grpc_port=_env_int("QDRANT_GRPC_PORT", 6334),
             mongo_uri=os.environ.get("MONGO_URI", "mongodb://localhost:27017"),
             mongo_db=os.environ.get("MONGO_DB", "app"),
             eventbus_enabled=_env_bool("EVENTBUS_ENABLED", True),
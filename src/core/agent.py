@@ -1,9 +1,12 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, List, Pattern, Tuple, Union
+from contextlib import contextmanager
+from contextvars import ContextVar
 from time import time
 from pathlib import Path
 import os
+import re
 
 try:
     import ollama
@@ -28,20 +31,65 @@ class AgentConfig:
     history_max_messages: int = 8      # NEW: keep last N history messages (default ~4 exchanges)
 
 
+# --------- Per-call early stop --------------------
+# agent name -> stop pattern for LLMAgent runs inside stop_regex_for(...);
+# scoped to the current context, so shared model_config dicts are never touched
+_STOP_REGEX_OVERRIDES: ContextVar[Mapping[str, Union[str, Pattern[str]]]] = ContextVar(
+    "stop_regex_overrides", default={})
+
+@contextmanager
+def stop_regex_for(agent_names: Iterable[str], stop_pattern: Union[str, Pattern[str]]) -> Iterator[None]:
+    """Within the block, the named LLMAgents stream and stop at stop_pattern (see LLMAgent.run)."""
+    overrides = {**_STOP_REGEX_OVERRIDES.get(), **{name: stop_pattern for name in agent_names}}
+    token = _STOP_REGEX_OVERRIDES.set(overrides)
+    try:
+        yield
+    finally:
+        _STOP_REGEX_OVERRIDES.reset(token)
+
+
 # --------- Prompt loading (minimal) ---------------
 def _prompt_dir() -> Path:
     # PROMPT_DIR can be overridden via env; default ./prompts
     return Path(os.environ.get("PROMPT_DIR", "prompts")).resolve()
 
+# path -> ((mtime_ns, size), text); a prompt is re-read only when its file changes.
+# size is part of the key because coarse filesystem timestamps can leave mtime
+# unchanged across two quick writes
+_PROMPT_CACHE: Dict[Path, Tuple[Tuple[int, int], str]] = {}
+
 def _load_system_prompt_from_config(cfg: AgentConfig) -> str:
     if not cfg.prompt_file:
         raise FileNotFoundError("AgentConfig.prompt_file is required to load the system prompt.")
     p = Path(cfg.prompt_file)
     if not p.is_absolute():
         p = _prompt_dir() / cfg.prompt_file
-    if not p.exists():
-        raise FileNotFoundError(f"Prompt file not found: {p}")
-    return p.read_text(encoding="utf-8")
+    try:
+        st = p.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Prompt file not found: {p}") from None
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _PROMPT_CACHE.get(p)
+    if cached and cached[0] == key:
+        return cached[1]
+    text = p.read_text(encoding="utf-8")
+    _PROMPT_CACHE[p] = (key, text)
+    return text
+
+
+# --------- Ollama clients (one per host, reused across runs) ---------
+_OLLAMA_CLIENTS: Dict[str, Any] = {}
+
+def get_ollama_client(host: str) -> Any:
+    """
+    Shared ollama.Client for a host. Reusing it keeps the underlying HTTP
+    connection pool alive instead of reconnecting on every LLMAgent.run().
+    """
+    client = _OLLAMA_CLIENTS.get(host)
+    if client is None:
+        client = ollama.Client(host=host)
+        _OLLAMA_CLIENTS[host] = client
+    return client
 
 
 # ------------- BaseAgent -------------------
@@ -91,10 +139,16 @@ class LLMAgent(BaseAgent):
       - Builds messages: [system] + trimmed(history) + [current user].
       - Trimming uses config.history_max_messages (default 8).
       - Calls ollama.chat(...) directly (no fallback).
+      - model_config["keep_alive"] (e.g. "30m") is forwarded to Ollama.
+      - model_config["client"] may carry a pre-built ollama.Client; otherwise a
+        per-host shared client is used (see get_ollama_client).
+      - With a stop pattern (run(..., stop_regex=...), stop_regex_for(...) or
+        model_config["stop_regex"], in that order), streams the reply and stops
+        as soon as the pattern matches (partial text is returned).
       - Lets exceptions propagate so BaseAgent.execute() can retry if configured.
     """
 
-    def run(self, message: Message) -> Result:
+    def run(self, message: Message, stop_regex: Union[str, Pattern[str], None] = None) -> Result:
         if not OLLAMA_AVAILABLE:
             raise ImportError("ollama package not available. Install with: pip install ollama")
 
@@ -145,20 +199,34 @@ class LLMAgent(BaseAgent):
         settings = Settings()
         model = model_cfg.get("model", settings.ollama_model)
         OPT_KEYS = ("temperature", "top_p", "frequency_penalty", "presence_penalty", "num_ctx")
-        options = {k: model_cfg[k] for k in OPT_KEYS if k in model_cfg}
-        
-        client = ollama.Client(host=settings.ollama_host)
-        # 5) Call Ollama (no streaming)
-        response = client.chat(
-            model=model,
-            messages=messages,
-            options=options,
-            stream=False,
-        )
-        try:
-            text = (response.get("message") or {}).get("content") or ""
-        except Exception as e:
-            raise RuntimeError(f"Unexpected Ollama response format: {response}") from e
+        # nested "options" (as built by get_model_config) + top-level shortcuts (which win)
+        options = dict(model_cfg.get("options") or {})
+        options.update({k: model_cfg[k] for k in OPT_KEYS if k in model_cfg})
+        # keep_alive keeps the model (and Ollama's prompt cache) resident between calls,
+        # so sibling agents sharing a prompt prefix skip most of the prefill.
+        chat_kwargs: Dict[str, Any] = {}
+        if model_cfg.get("keep_alive") is not None:
+            chat_kwargs["keep_alive"] = model_cfg["keep_alive"]
+
+        client = model_cfg.get("client") or get_ollama_client(model_cfg.get("host") or settings.ollama_host)
+        # 5) Call Ollama (streams only when an early-stop pattern is configured)
+        stop_pattern = (stop_regex or _STOP_REGEX_OVERRIDES.get().get(self.config.name)
+                        or model_cfg.get("stop_regex"))
+        early_stopped = False
+        if stop_pattern:
+            text, early_stopped = self._stream_until(client, model, messages, options, stop_pattern, **chat_kwargs)
+        else:
+            response = client.chat(
+                model=model,
+                messages=messages,
+                options=options,
+                stream=False,
+                **chat_kwargs,
+            )
+            try:
+                text = (response.get("message") or {}).get("content") or ""
+            except Exception as e:
+                raise RuntimeError(f"Unexpected Ollama response format: {response}") from e
 
         # 6) Result
         res = Result.ok(output={"text": text}, display_output=to_display(text))
@@ -166,4 +234,43 @@ class LLMAgent(BaseAgent):
         res.metrics["input_chars_user"] = len(user_prompt)
         res.metrics["history_messages_used"] = len(trimmed_history) if trimmed_history else 0
         res.metrics["output_chars"] = len(text)
+        if stop_pattern:
+            res.metrics["early_stopped"] = early_stopped
         return res
+
+    @staticmethod
+    def _stream_until(client: Any, model: str, messages: List[Dict[str, str]],
+                      options: Dict[str, Any], stop_pattern: Union[str, Pattern[str]],
+                      **chat_kwargs: Any) -> Tuple[str, bool]:
+        """
+        Stream a chat completion and stop as soon as stop_pattern matches the
+        accumulated text. Closing the stream drops the HTTP connection, which
+        makes Ollama abandon the remaining generation.
+        Returns (text_so_far, early_stopped).
+        """
+        pattern = re.compile(stop_pattern, re.IGNORECASE) if isinstance(stop_pattern, str) else stop_pattern
+        stream = client.chat(model=model, messages=messages, options=options, stream=True, **chat_kwargs)
+        buf = ""
+        try:
+            for chunk in stream:
+                try:
+                    piece = (chunk.get("message") or {}).get("content") or ""
+                except Exception as e:
+                    raise RuntimeError(f"Unexpected Ollama response format: {chunk}") from e
+                if not piece:
+                    continue
+                buf += piece
+                if pattern.search(buf):
+                    return buf, True
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+        return buf, False
+
+    def stream(self, prompt: str, stop_pattern: Union[str, Pattern[str]]) -> str:
+        """
+        Run a single-turn prompt and return the partial output up to the first
+        stop_pattern match (or the full output if it never matches).
+        """
+        return self.run(Message(data={"user_prompt": prompt}), stop_regex=stop_pattern).output["text"]
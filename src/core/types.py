@@ -32,6 +32,14 @@ class Result:
     metrics: Dict[str, Any] = field(default_factory=dict)
     overrides: Dict[str, Any] = field(default_factory=dict)  # prompts/model_config futuros
 
+    def text(self) -> Optional[str]:
+        """Texto da saída (output["text"]) ou None se a saída não for textual."""
+        o = self.output
+        if isinstance(o, dict):
+            t = o.get("text")
+            return t if isinstance(t, str) else None
+        return None
+
     @staticmethod
     def ok(output: Any = None, display_output: Optional[str] = None,
            control: Optional[ControlFlag] = None, overrides: Optional[Dict[str, Any]] = None,
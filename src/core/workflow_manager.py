@@ -1,7 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Deque, Tuple
+from typing import Any, Dict, List, Optional, Deque, Sequence, Tuple
 from collections import deque, defaultdict
+import asyncio
 import traceback
 import time
 
@@ -27,13 +28,48 @@ class NodeState:
         # retry_history intentionally persists until explicitly cleared
 
 
+class WorkflowResults(List[Result]):
+    """
+    List of Results returned by run_workflow (fully list-compatible).
+
+    Also keeps the last Result per node (by_node) so callers can ask for the
+    outputs of sink nodes (nodes without outgoing edges) via sinks().
+    With result_retention="sinks" the list itself only holds the last
+    `tail_size` Results; by_node still has the latest Result of every node.
+    """
+    def __init__(self, sink_nodes: List[str], tail_size: Optional[int] = None):
+        super().__init__()
+        self.by_node: Dict[str, Result] = {}
+        self._sink_nodes = set(sink_nodes)
+        self._order: Dict[str, int] = {}
+        self._seq = 0
+        self._tail_size = tail_size
+
+    def record(self, node: str, res: Result) -> None:
+        self.by_node[node] = res
+        self._order[node] = self._seq
+        self._seq += 1
+        self.append(res)
+        if self._tail_size is not None and len(self) > self._tail_size:
+            del self[0]
+
+    def sinks(self) -> List[Result]:
+        """Last Result of each sink node, in execution order."""
+        nodes = sorted((n for n in self.by_node if n in self._sink_nodes), key=self._order.__getitem__)
+        return [self.by_node[n] for n in nodes]
+
+
 class WorkflowManager:
+    RESULT_TAIL_SIZE = 16
+
     def __init__(
         self,
         graph: Dict[str, List[str]],
         agents: Dict[str, BaseAgent],
         metrics: Optional[MetricsCollector] = None,
         node_policies: Optional[Dict[str, Dict[str, Any]]] = None,
+        dispatcher: Optional[Any] = None,
+        result_retention: str = "all",
     ):
         """
         Manages a workflow graph of agents, node states, and retry/fallback logic.
@@ -48,14 +84,30 @@ class WorkflowManager:
           - max_retries: int  (default 0) → for both exceptions AND failed results
           - on_error: Optional[str] → fallback node name
           - retry_on_failure: bool (default False) → whether Result.success=False triggers retries
+
+        dispatcher (optional): object with order(nodes, agents) -> nodes, used to reorder
+        multi-branch successors (e.g. FanOutDispatcher groups branches sharing a model/prompt prefix).
+
+        result_retention:
+          - "all" (default): run_workflow returns every Result in execution order
+          - "sinks": only the last RESULT_TAIL_SIZE Results are kept in the list; the latest
+            Result per node stays available via results.by_node / results.sinks()
         """
+        if result_retention not in ("all", "sinks"):
+            raise ValueError(f"result_retention must be 'all' or 'sinks', got {result_retention!r}")
         self.graph = graph
         self.agents = agents
         self.state: Dict[str, NodeState] = defaultdict(NodeState)
         self.run_overrides: Dict[str, Dict[str, Any]] = defaultdict(dict)
         self.in_degree: Dict[str, int] = self._compute_in_degree(graph)
+        # like in_degree, successors and sink nodes are computed once per manager:
+        # mutating graph afterwards is not picked up (FlowBuilder.manager passes a copy)
+        self._adj: Dict[str, Tuple[str, ...]] = {n: tuple(targets) for n, targets in graph.items()}
+        self._sinks: List[str] = self._sink_nodes()
         self.metrics = metrics
         self.node_policies = node_policies or {}
+        self.dispatcher = dispatcher
+        self.result_retention = result_retention
 
     @staticmethod
     def _compute_in_degree(graph: Dict[str, List[str]]) -> Dict[str, int]:
@@ -116,8 +168,11 @@ class WorkflowManager:
                     cur["prompt_file"] = cfg["prompt_file"]
                 self.run_overrides[tgt] = cur
 
-    def _next_nodes(self, current: str) -> List[str]:
-        return self.graph.get(current, [])
+    def _next_nodes(self, current: str) -> Sequence[str]:
+        nxt = self._adj.get(current, ())
+        if self.dispatcher is not None and len(nxt) > 1:
+            return self.dispatcher.order(list(nxt), self.agents)
+        return nxt
 
     def _safe_metric(self, method: str, *args, **kwargs) -> None:
         """Safely call metrics method if present."""
@@ -158,12 +213,49 @@ class WorkflowManager:
         """
         return {n: st.retry_history[:] for n, st in self.state.items() if st.retry_history}
 
-    def run_workflow(self, entry: str, input_data: Any) -> List[Result]:
+    def _sink_nodes(self) -> List[str]:
+        nodes = set(self.in_degree) | set(self.agents)
+        return [n for n in nodes if not self.graph.get(n)]
+
+    def fork(self) -> "WorkflowManager":
+        """
+        Same graph, agents, metrics and policies with fresh run state
+        (node states, overrides, retry history), so runs don't clobber each other.
+        Agents are shared, not copied: forks can run concurrently only if the agents
+        are stateless per call (no per-run fields on self, no prompt overrides that
+        rewrite their configs). The metrics collector is shared too; MetricsCollector
+        is thread-safe and records every fork's nodes under its run_id.
+        """
+        wm = WorkflowManager(
+            self.graph, self.agents,
+            metrics=self.metrics,
+            node_policies=self.node_policies,
+            dispatcher=self.dispatcher,
+            result_retention=self.result_retention,
+        )
+        wm.RESULT_TAIL_SIZE = self.RESULT_TAIL_SIZE
+        return wm
+
+    async def run_workflow_async(self, entry: str, input_data: Any) -> WorkflowResults:
+        """
+        Awaitable run_workflow for independent runs, e.g.
+            r1, r2 = await asyncio.gather(wm.run_workflow_async("A", x), wm.run_workflow_async("A", y))
+        Each call runs on a fork() in the loop's default executor: agents are synchronous,
+        so concurrency comes from overlapping their I/O (Ollama, Qdrant) across threads.
+        Agents are shared, so graphs whose prompt overrides rewrite agent configs
+        should not be gathered. Retry history stays on the fork, not on this manager.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.fork().run_workflow, entry, input_data)
+
+    def run_workflow(self, entry: str, input_data: Any) -> WorkflowResults:
         """
         Run the workflow from the entry node with provided input data.
-        Returns a list of all Results in execution order.
+        Returns a WorkflowResults list of all Results in execution order
+        (only the tail when result_retention="sinks").
         """
-        results: List[Result] = []
+        tail = self.RESULT_TAIL_SIZE if self.result_retention == "sinks" else None
+        results = WorkflowResults(self._sinks, tail_size=tail)
         q: Deque[Tuple[str, Message]] = deque()
         self.state.clear()
         self.run_overrides.clear()
@@ -205,7 +297,7 @@ class WorkflowManager:
 
             try:
                 res = agent.execute(payload)
-                results.append(res)  # keep previous behavior: collect every Result
+                results.record(node, res)  # keep previous behavior: collect every Result
                 ns.last_producer = payload.meta.get("last_producer")
 
                 self._safe_metric("on_end_node", node, {
@@ -1,9 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Tuple
 import re
 
-from src.core.agent import AgentConfig, LLMAgent
+from src.core.agent import AgentConfig, LLMAgent, stop_regex_for
 from src.core.workflow_manager import WorkflowManager
 from src.eval.metrics import MetricsCollector
 from src.core.types import Message
@@ -29,6 +29,29 @@ def parse_judge_md(md: str) -> Dict[str, Any]:
         verdict = "FAIL"
     return {"verdict": verdict, "reasons": reasons}
 
+# ---- Parser para o juiz em lote (### VERDICT i / ### REASONS i) ----
+JUDGE_BATCH_SIZE = 8
+# system prompt do juiz em lote (o eval_judge.md descreve um único caso)
+JUDGE_BATCH_PROMPT_FILE = "eval_judge_batch.md"
+_BATCH_VERDICT = re.compile(r"^###\s*VERDICT\s+(\d+)\s*\n\s*(PASS|FAIL)\b", re.IGNORECASE | re.MULTILINE)
+_BATCH_REASONS = re.compile(r"^###\s*REASONS\s+(\d+)\s*\n(?P<body>.*?)(?=^\s*###\s+|\Z)",
+                            re.IGNORECASE | re.MULTILINE | re.DOTALL)
+
+def parse_judge_batch_md(md: str) -> Dict[int, Dict[str, Any]]:
+    """Retorna {indice_do_caso: {"verdict", "reasons"}} apenas para casos com veredito."""
+    parsed: Dict[int, Dict[str, Any]] = {}
+    for m in _BATCH_VERDICT.finditer(md or ""):
+        parsed.setdefault(int(m.group(1)), {"verdict": m.group(2).upper(), "reasons": []})
+    for r in _BATCH_REASONS.finditer(md or ""):
+        entry = parsed.get(int(r.group(1)))
+        if entry is None:
+            continue
+        for ln in (r.group("body") or "").strip().splitlines():
+            s = ln.strip().lstrip("-• \t")
+            if s:
+                entry["reasons"].append(s)
+    return parsed
+
 @dataclass
 class EvalCase:
     case_id: str
@@ -45,59 +68,149 @@ class EvaluationRunner:
       - Executa a pipeline várias vezes (cada EvalCase)
       - Coleta métricas por nó em MetricsCollector
       - Faz julgamento por:
-         * 'regex': pattern obrigatório na saída final
-         * 'llm': usa LLMAgent + prompt_file 'eval_judge.md'
+         * 'regex': pattern obrigatório na saída final (com early_stop=True, opt-in,
+           o LLM final é lido em streaming e interrompido no primeiro match)
+         * 'llm': usa LLMAgent + prompt_file 'eval_judge.md' (vários casos: um lote
+           por chamada com 'eval_judge_batch.md')
     """
     def __init__(self, wm: WorkflowManager, metrics: MetricsCollector):
         self.wm = wm
         self.metrics = metrics
 
+    def _sink_llm_agents(self) -> List[LLMAgent]:
+        """LLMAgents sem arestas de saída (produzem o texto final)."""
+        return [a for n, a in self.wm.agents.items()
+                if isinstance(a, LLMAgent) and not self.wm.graph.get(n)]
+
+    def _final_text(self, case: EvalCase, stop_regex: Optional[str] = None) -> str:
+        # executa (com early-stop por streaming nos nós finais, se pedido; só nesta chamada,
+        # sem mexer no model_config compartilhado dos agentes)
+        if stop_regex:
+            with stop_regex_for([a.config.name for a in self._sink_llm_agents()], stop_regex):
+                results = self.wm.run_workflow(case.entry_node, case.input_data)
+        else:
+            results = self.wm.run_workflow(case.entry_node, case.input_data)
+        # pega última saída textual “final”
+        for r in reversed(results):
+            text = r.text()
+            if text is not None:
+                return text
+        return ""
+
+    @staticmethod
+    def _judge_agent(llm_model_cfg: Optional[Dict[str, Any]], judge_prompt_file: str) -> LLMAgent:
+        return LLMAgent(AgentConfig(
+            name="EvalJudge",
+            prompt_file=judge_prompt_file,
+            model_config=llm_model_cfg or {}
+        ))
+
+    def _judge_llm(self, case: EvalCase, final_text: str,
+                   llm_model_cfg: Optional[Dict[str, Any]],
+                   judge_prompt_file: str) -> Tuple[str, List[str]]:
+        # Use LLMAgent with system prompt from file - no manual template loading needed
+        case_md = case.case_md or ""
+        user_prompt = f"""Case description: {case_md}
+
+Model output to evaluate: {final_text}
+
+Please evaluate this output against the case requirements."""
+
+        judge_agent = self._judge_agent(llm_model_cfg, judge_prompt_file)
+        judge_message = Message(data={"user_prompt": user_prompt})
+        # execute(): erro do Ollama vira Result.fail (veredito FAIL) em vez de derrubar o lote
+        judge_result = judge_agent.execute(judge_message)
+
+        if judge_result.success:
+            judge_output = judge_result.output.get("text", "")
+            parsed = parse_judge_md(judge_output)
+            return parsed["verdict"], parsed["reasons"]
+        return "FAIL", [f"Judge LLM failed: {judge_result.output}"]
+
+    def _judge_llm_batch(self, items: List[Tuple[EvalCase, str]],
+                         llm_model_cfg: Optional[Dict[str, Any]],
+                         judge_prompt_file: str,
+                         judge_batch_prompt_file: str = JUDGE_BATCH_PROMPT_FILE) -> List[Tuple[str, List[str]]]:
+        """
+        Julga vários casos com uma única chamada ao LLM (system prompt judge_batch_prompt_file).
+        Casos sem veredito parseável (ou falha do lote) voltam para o juiz individual
+        com judge_prompt_file.
+        """
+        blocks = []
+        for i, (case, final_text) in enumerate(items, start=1):
+            blocks.append(
+                f"### CASE {i}\n"
+                f"Case description: {case.case_md or ''}\n\n"
+                f"Model output to evaluate: {final_text}\n"
+            )
+        user_prompt = (
+            "Evaluate each case below independently against its requirements.\n\n"
+            + "\n".join(blocks)
+            + "\nFor EVERY case i, return exactly these sections:\n\n"
+            "### VERDICT i\nPASS or FAIL\n\n"
+            "### REASONS i\n- short bullet\n"
+        )
+
+        judge_agent = self._judge_agent(llm_model_cfg, judge_batch_prompt_file)
+        judge_result = judge_agent.execute(Message(data={"user_prompt": user_prompt}))
+        parsed = parse_judge_batch_md(judge_result.output.get("text", "")) if judge_result.success else {}
+
+        out: List[Tuple[str, List[str]]] = []
+        for i, (case, final_text) in enumerate(items, start=1):
+            if i in parsed:
+                out.append((parsed[i]["verdict"], parsed[i]["reasons"]))
+            else:
+                out.append(self._judge_llm(case, final_text, llm_model_cfg, judge_prompt_file))
+        return out
+
     def run_case(self, case: EvalCase, final_node_name: Optional[str] = None,
                  judge: str = "regex",
                  llm_model_cfg: Optional[Dict[str,Any]] = None,
-                 judge_prompt_file: str = "eval_judge.md") -> Dict[str, Any]:
-        # executa
-        results = self.wm.run_workflow(case.entry_node, case.input_data)
-        # pega última saída textual “final”
-        final_text = ""
-        for r in reversed(results):
-            if isinstance(r.output, dict) and "text" in r.output and isinstance(r.output["text"], str):
-                final_text = r.output["text"]
-                break
+                 judge_prompt_file: str = "eval_judge.md",
+                 early_stop: bool = False) -> Dict[str, Any]:
+        if early_stop and judge != "regex":
+            raise ValueError("early_stop only applies to judge='regex'")
+        # No juiz regex basta ver o padrão: o LLM final para de gerar assim que ele aparece.
+        stop_regex = case.required_regex if (judge == "regex" and early_stop) else None
+        final_text = self._final_text(case, stop_regex=stop_regex)
 
         # julgamento
         verdict, reasons = "FAIL", []
         if judge == "regex" and case.required_regex:
             verdict = "PASS" if re.search(case.required_regex, final_text, re.IGNORECASE) else "FAIL"
         elif judge == "llm":
-            # Use LLMAgent with system prompt from file - no manual template loading needed
-            case_md = case.case_md or ""
-            user_prompt = f"""Case description: {case_md}
-
-Model output to evaluate: {final_text}
-
-Please evaluate this output against the case requirements."""
-            
-            judge_agent = LLMAgent(AgentConfig(
-                name="EvalJudge", 
-                prompt_file=judge_prompt_file, 
-                model_config=llm_model_cfg or {}
-            ))
-            judge_message = Message(data={"user_prompt": user_prompt})
-            judge_result = judge_agent.run(judge_message)
-            
-            if judge_result.success:
-                judge_output = judge_result.output.get("text", "")
-                parsed = parse_judge_md(judge_output)
-                verdict, reasons = parsed["verdict"], parsed["reasons"]
-            else:
-                verdict, reasons = "FAIL", [f"Judge LLM failed: {judge_result.output}"]
+            verdict, reasons = self._judge_llm(case, final_text, llm_model_cfg, judge_prompt_file)
 
         return {"case_id": case.case_id, "verdict": verdict, "reasons": reasons, "final_text": final_text}
 
     def run(self, cases: List[EvalCase], **kwargs) -> List[Dict[str, Any]]:
+        if kwargs.get("early_stop") and kwargs.get("judge", "regex") != "regex":
+            raise ValueError("early_stop only applies to judge='regex'")
+        if kwargs.get("judge") == "llm" and len(cases) > 1:
+            kwargs.pop("early_stop", None)
+            return self._run_llm_batched(cases, **kwargs)
+        # só o caminho em lote usa
+        kwargs.pop("judge_batch_prompt_file", None)
+        kwargs.pop("batch_size", None)
         results=[]
         for c in cases:
             res=self.run_case(c, **kwargs)
             results.append(res)
         return results
+
+    def _run_llm_batched(self, cases: List[EvalCase], final_node_name: Optional[str] = None,
+                         judge: str = "llm",
+                         llm_model_cfg: Optional[Dict[str, Any]] = None,
+                         judge_prompt_file: str = "eval_judge.md",
+                         judge_batch_prompt_file: str = JUDGE_BATCH_PROMPT_FILE,
+                         batch_size: int = JUDGE_BATCH_SIZE) -> List[Dict[str, Any]]:
+        """Executa todos os casos e agrupa o julgamento LLM em lotes de até batch_size."""
+        finals = [(c, self._final_text(c)) for c in cases]
+        results = []
+        for start in range(0, len(finals), max(1, batch_size)):
+            chunk = finals[start:start + max(1, batch_size)]
+            verdicts = self._judge_llm_batch(chunk, llm_model_cfg, judge_prompt_file, judge_batch_prompt_file)
+            for (case, final_text), (verdict, reasons) in zip(chunk, verdicts):
+                results.append({"case_id": case.case_id, "verdict": verdict,
+                                "reasons": reasons, "final_text": final_text})
+        return results
@@ -1,7 +1,13 @@
 from __future__ import annotations
 from dataclasses import dataclass, field, asdict
-from typing import Any, Dict, List, Optional
-import time, csv, io
+from typing import Any, Dict, List, Optional, Tuple
+import time, csv, io, json, threading
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 @dataclass
 class NodeRecord:
@@ -21,18 +27,24 @@ class MetricsCollector:
     """
     Coleta eventos por nó e permite exportar CSV/JSON in-memory.
     Integra-se ao WorkflowManager via hooks on_start/on_end.
+    Thread-safe: forks do WorkflowManager (run_workflow_async) compartilham o
+    mesmo coletor; nós abertos são separados por thread.
     """
     def __init__(self, run_id: Optional[str] = None):
         self.run_id = run_id or f"run-{int(time.time()*1000)}"
-        self._open_nodes: Dict[str, float] = {}
+        self._open_nodes: Dict[Tuple[int, str], float] = {}
         self.records: List[NodeRecord] = []
+        self._lock = threading.Lock()
 
     # --- Hooks (chamados pelo WorkflowManager) ---
     def on_start_node(self, node: str):
-        self._open_nodes[node] = time.time()
+        with self._lock:
+            self._open_nodes[(threading.get_ident(), node)] = time.time()
 
     def on_end_node(self, node: str, result: Dict[str, Any]):
-        st = self._open_nodes.pop(node, time.time())
+        with self._lock:
+            st = self._open_nodes.pop((threading.get_ident(), node), None)
+        st = st if st is not None else time.time()
         et = time.time()
         metrics = result.get("metrics", {}) if isinstance(result, dict) else {}
         control = result.get("control", {}) if isinstance(result, dict) else {}
@@ -51,7 +63,8 @@ class MetricsCollector:
             output_chars=int(metrics.get("output_chars", 0) or 0),
             extra={"has_output_text": bool(isinstance(output, dict) and ("text" in output))}
         )
-        self.records.append(rec)
+        with self._lock:
+            self.records.append(rec)
 
     # --- Export helpers ---
     def to_csv(self) -> str:
@@ -65,6 +78,13 @@ class MetricsCollector:
             ])
         return buf.getvalue()
 
+    def to_json(self) -> str:
+        """Serializa summary + records (usa orjson se instalado; senão json da stdlib)."""
+        payload = {"summary": self.summary(), "records": [asdict(r) for r in self.records]}
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(payload, default=str).decode("utf-8")
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str)
+
     def summary(self) -> Dict[str, Any]:
         total = len(self.records)
         ok = sum(1 for r in self.records if r.success)
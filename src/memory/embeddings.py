@@ -1,10 +1,14 @@
 from __future__ import annotations
+from array import array
+from pathlib import Path
 from typing import List
-import os, requests
+import hashlib, os, sqlite3, threading, requests
 
 class OllamaEmbeddings:
     """
-    Usa /api/embeddings do Ollama. Defina OLLAMA_EMBED_MODEL (ex.: 'nomic-embed-text').
+    Usa /api/embed do Ollama (lote: todos os textos numa requisição), com
+    fallback para /api/embeddings (um texto por requisição) em versões antigas.
+    Defina OLLAMA_EMBED_MODEL (ex.: 'nomic-embed-text').
     """
     def __init__(self, model: str | None = None, host: str | None = None, timeout: float = 60.0):
         self.model = model or os.getenv("OLLAMA_EMBED_MODEL","nomic-embed-text")
@@ -12,6 +16,16 @@ class OllamaEmbeddings:
         self.timeout = timeout
 
     def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        resp=requests.post(f"{self.host}/api/embed",json={"model":self.model,"input":list(texts)},timeout=self.timeout)
+        if resp.status_code==404 and "model" not in resp.text.lower():
+            # Ollama < 0.3 não tem /api/embed
+            return self._embed_each(texts)
+        resp.raise_for_status()
+        return resp.json().get("embeddings",[])
+
+    def _embed_each(self, texts: List[str]) -> List[List[float]]:
         out=[]
         url=f"{self.host}/api/embeddings"
         for t in texts:
@@ -21,3 +35,51 @@ class OllamaEmbeddings:
             vec=data.get("embedding",[])
             out.append(vec)
         return out
+
+
+class CachedEmbedder:
+    """
+    Cache de embeddings endereçado por conteúdo (SQLite), em volta de qualquer
+    embedder com embed(texts). Chave: blake2b(modelo + "\0" + texto); valor: float32.
+    Só os textos ausentes vão para o embedder interno, numa única chamada.
+    """
+    def __init__(self, inner, path: str | os.PathLike):
+        self.inner = inner
+        self.model = getattr(inner, "model", "")
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # usado também por threads (run_workflow_async): conexão compartilhada + lock
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB)")
+        self._lock = threading.Lock()
+
+    def _key(self, text: str) -> str:
+        return hashlib.blake2b(f"{self.model}\0{text}".encode("utf-8"), digest_size=20).hexdigest()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(t) for t in texts]
+        with self._lock:
+            found = {}
+            uniq = list(dict.fromkeys(keys))
+            for i in range(0, len(uniq), 500):  # limite de parâmetros do SQLite
+                chunk = uniq[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vec FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update({k: array("f", v).tolist() for k, v in rows})
+        misses = list(dict.fromkeys(t for t, k in zip(texts, keys) if k not in found))
+        if misses:
+            vecs = self.inner.embed(misses)
+            if len(vecs) != len(misses):
+                # zip truncaria em silêncio e o KeyError abaixo esconderia a causa
+                raise ValueError(f"{type(self.inner).__name__}.embed returned {len(vecs)} vectors "
+                                 f"for {len(misses)} texts")
+            with self._lock, self._conn:
+                for t, vec in zip(misses, vecs):
+                    k = self._key(t)
+                    found[k] = vec
+                    self._conn.execute("INSERT OR REPLACE INTO embeddings VALUES (?, ?)",
+                                       (k, array("f", vec).tobytes()))
+        return [list(found[k]) for k in keys]
+
+    def close(self):
+        self._conn.close()
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from .mongo_stm import MongoSTM
 from .qdrant_store import QdrantVectorStore
 
@@ -19,5 +19,15 @@ class MemoryManager:
     def index_document(self, text: str, meta: Dict[str,Any]|None=None):
         self.ltm.index_texts([{"text": text, "meta": meta or {}}])
 
+    def index_documents(self, texts: List[str], metas: Optional[List[Dict[str,Any]|None]]=None):
+        """texts[i] com metas[i] -> um embedding em lote + um único upsert."""
+        metas = metas or [None] * len(texts)
+        if len(metas) != len(texts):
+            raise ValueError("index_documents: texts and metas must have the same length")
+        self.ltm.index_texts([{"text": text, "meta": meta or {}} for text, meta in zip(texts, metas)])
+
     def search_context(self, query: str, top_k: int=5) -> List[Dict[str,Any]]:
         return self.ltm.search(query, top_k=top_k)
+
+    def search_contexts(self, queries: List[str], top_k: int=5) -> List[List[Dict[str,Any]]]:
+        return self.ltm.search_batch(queries, top_k=top_k)
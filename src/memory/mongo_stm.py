@@ -1,17 +1,19 @@
 from __future__ import annotations
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import os, time
 from pymongo import MongoClient, ASCENDING
 from src.config.settings import get_settings
 
 class MongoSTM:
-    def __init__(self, uri: str | None = None, db_name: str = "agentic", coll_name: str = "stm"):
+    def __init__(self, uri: str | None = None, db_name: str = "agentic", coll_name: str = "stm",
+                 client: Optional[MongoClient] = None):
+        """client: MongoClient já conectado (reutilizado; sobrepõe uri)."""
         if uri is None:
             settings = get_settings()
             self.uri = settings.mongo_uri
         else:
             self.uri = uri
-        self.client = MongoClient(self.uri)
+        self.client = client if client is not None else MongoClient(self.uri)
         self.db = self.client[db_name]
         self.coll = self.db[coll_name]
         self.coll.create_index([("session_id", ASCENDING), ("ts", ASCENDING)])
@@ -0,0 +1,79 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import List, Optional
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+    ONNX_AVAILABLE = np is not None
+except ImportError:
+    ONNX_AVAILABLE = False
+
+
+def quantize_model(model_path: str | os.PathLike, out_path: str | os.PathLike) -> Path:
+    """
+    Quantização dinâmica int8 (pesos) de um modelo de embeddings exportado para ONNX.
+    Feito uma vez: se out_path já existe, só o retorna.
+    """
+    out = Path(out_path)
+    if not out.exists():
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        out.parent.mkdir(parents=True, exist_ok=True)
+        quantize_dynamic(str(model_path), str(out), weight_type=QuantType.QInt8)
+    return out
+
+
+class OnnxEmbedder:
+    """
+    Embeddings locais em CPU com ONNX Runtime, alternativa ao OllamaEmbeddings
+    (mesma interface embed(texts)). model_dir precisa ter model.onnx (ou
+    model_quantized.onnx) e tokenizer.json de um sentence-transformer exportado.
+    Saída: mean pooling sobre a attention mask + normalização L2.
+    """
+    def __init__(self, model_dir: str | os.PathLike, batch_size: int = 32, max_length: int = 256,
+                 session: Optional[object] = None, tokenizer: Optional[object] = None):
+        if session is None and not ONNX_AVAILABLE:
+            raise ImportError("OnnxEmbedder requires onnxruntime, tokenizers and numpy")
+        model_dir = Path(model_dir)
+        self.model = f"onnx:{model_dir.name}"  # usado na chave do CachedEmbedder
+        self.batch_size = batch_size
+        if tokenizer is None:
+            tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+            tokenizer.enable_truncation(max_length=max_length)
+            tokenizer.enable_padding()
+        self.tokenizer = tokenizer
+        if session is None:
+            model_file = model_dir / "model_quantized.onnx"
+            if not model_file.exists():
+                model_file = model_dir / "model.onnx"
+            opts = ort.SessionOptions()
+            opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            opts.intra_op_num_threads = os.cpu_count() or 1
+            session = ort.InferenceSession(str(model_file), opts, providers=["CPUExecutionProvider"])
+        self.session = session
+        self._input_names = {i.name for i in session.get_inputs()}
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        out: List[List[float]] = []
+        for i in range(0, len(texts), self.batch_size):
+            out.extend(self._embed_batch(texts[i:i + self.batch_size]))
+        return out
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        enc = self.tokenizer.encode_batch(list(texts))
+        ids = np.array([e.ids for e in enc], dtype=np.int64)
+        mask = np.array([e.attention_mask for e in enc], dtype=np.int64)
+        feeds = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(ids)
+        hidden = self.session.run(None, feeds)[0]  # (batch, tokens, dim)
+        m = mask[..., None].astype(hidden.dtype)
+        pooled = (hidden * m).sum(axis=1) / np.clip(m.sum(axis=1), 1e-9, None)
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.tolist()
@@ -1,31 +1,89 @@
 from __future__ import annotations
-from typing import List, Dict, Any, Optional
-import os, uuid
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+import os, threading, uuid
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct, QueryRequest, SearchParams, QuantizationSearchParams,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+)
 from src.config.settings import get_settings
 
 from .embeddings import OllamaEmbeddings
 
+# consultas repetidas (reruns, retriever chamado várias vezes) não re-embeddam
+QUERY_CACHE_SIZE = 512
+
+# int8: vetores 4x menores em RAM; a busca sobre-amostra e re-pontua com os float32 originais
+QUANTIZED_SEARCH_PARAMS = SearchParams(quantization=QuantizationSearchParams(rescore=True, oversampling=2.0))
+
 class QdrantVectorStore:
     def __init__(self, url: str | None = None, collection: str = "agentic_docs",
-                 embed_model: str | None = None):
-        if url is None:
-            settings = get_settings()
-            self.url = settings.qdrant_url
-        else:
-            self.url = url
+                 embed_model: str | None = None, client: Optional[QdrantClient] = None,
+                 embedder: Optional[Any] = None, quantize: bool = True):
+        """
+        client/embedder: instâncias compartilhadas (ex.: fixtures de sessão) em vez de
+        abrir um QdrantClient / OllamaEmbeddings por store. embedder precisa de embed(texts).
+        quantize: coleções novas usam quantização escalar int8 (always_ram). Coleções já
+        existentes mantêm sua configuração.
+        """
+        settings = get_settings()
+        self.url = settings.qdrant_url if url is None else url
         self.collection = collection
-        self.client = QdrantClient(url=self.url)
-        self.embedder = OllamaEmbeddings(model=embed_model)
+        self.quantize = quantize
+        self._search_params = QUANTIZED_SEARCH_PARAMS if quantize else None
+        if client is None:
+            # QDRANT_PREFER_GRPC=1: protobuf/HTTP2 em vez de JSON/HTTP (porta QDRANT_GRPC_PORT)
+            client = QdrantClient(url=self.url, prefer_grpc=settings.qdrant_prefer_grpc,
+                                  grpc_port=settings.qdrant_grpc_port)
+        self.client = client
+        self.embedder = embedder if embedder is not None else OllamaEmbeddings(model=embed_model)
+        # LRU por instância (o embedder/modelo é fixo por store)
+        self._query_cache: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+        self._query_lock = threading.Lock()  # buscas concorrentes (fork()/run_workflow_async)
+
+    def _query_vectors(self, texts: List[str]) -> List[List[float]]:
+        """Vetores das consultas; as que não estão no LRU são embeddadas numa única chamada."""
+        unique = list(dict.fromkeys(texts))
+        # o lock cobre só o LRU (o embed é I/O e fica fora dele)
+        with self._query_lock:
+            known = {t: self._query_cache[t] for t in unique if t in self._query_cache}
+            for t in known:
+                self._query_cache.move_to_end(t)
+        misses = [t for t in unique if t not in known]
+        if misses:
+            fresh = {t: tuple(vec) for t, vec in zip(misses, self.embedder.embed(misses))}
+            known.update(fresh)
+            with self._query_lock:
+                self._query_cache.update(fresh)
+                while len(self._query_cache) > QUERY_CACHE_SIZE:
+                    self._query_cache.popitem(last=False)
+        return [list(known[t]) for t in texts]
+
+    @staticmethod
+    def _hits(points) -> List[Dict[str,Any]]:
+        out=[]
+        for r in points:
+            payload=r.payload or {}
+            out.append({"text": payload.get("text",""), "score": float(r.score), "meta": payload.get("meta",{})})
+        return out
 
     def _ensure_collection(self, dim: int):
         if self.collection not in [c.name for c in self.client.get_collections().collections]:
             self.client.create_collection(
                 collection_name=self.collection,
-                vectors_config=VectorParams(size=dim, distance=Distance.COSINE)
+                vectors_config=VectorParams(size=dim, distance=Distance.COSINE),
+                quantization_config=ScalarQuantization(
+                    scalar=ScalarQuantizationConfig(type=ScalarType.INT8, always_ram=True)
+                ) if self.quantize else None,
             )
 
+    def count(self) -> int:
+        """Number of points in the collection (0 if it does not exist yet)."""
+        if self.collection not in [c.name for c in self.client.get_collections().collections]:
+            return 0
+        return self.client.count(collection_name=self.collection, exact=True).count
+
     def index_texts(self, items: List[Dict[str,Any]]):
         """
         items: [{"id": "...", "text": "...", "meta": {...}}, ...]
@@ -42,11 +100,17 @@ class QdrantVectorStore:
         self.client.upsert(collection_name=self.collection, points=points)
 
     def search(self, query_text: str, top_k: int = 5, filter_: Optional[Any] = None) -> List[Dict[str,Any]]:
-        qvec=self.embedder.embed([query_text])[0]
+        qvec=self._query_vectors([query_text])[0]
         # Use the newer query_points API
-        res=self.client.query_points(collection_name=self.collection, query=qvec, limit=top_k, query_filter=filter_)
-        out=[]
-        for r in res.points:
-            payload=r.payload or {}
-            out.append({"text": payload.get("text",""), "score": float(r.score), "meta": payload.get("meta",{})})
-        return out
+        res=self.client.query_points(collection_name=self.collection, query=qvec, limit=top_k, query_filter=filter_,
+                                     search_params=self._search_params)
+        return self._hits(res.points)
+
+    def search_batch(self, queries: List[str], top_k: int = 5, filter_: Optional[Any] = None) -> List[List[Dict[str,Any]]]:
+        """Várias consultas: um embedding em lote + uma única requisição ao Qdrant. Resultados na ordem de queries."""
+        if not queries:
+            return []
+        vecs=self._query_vectors(queries)
+        reqs=[QueryRequest(query=v, limit=top_k, filter=filter_, params=self._search_params, with_payload=True) for v in vecs]
+        res=self.client.query_batch_points(collection_name=self.collection, requests=reqs)
+        return [self._hits(r.points) for r in res]
@@ -0,0 +1,55 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+import threading
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Cache em memória por similaridade: a chave é o embedding do texto e um
+    acerto é qualquer entrada do mesmo namespace com cosseno >= threshold.
+    Vetores normalizados ficam numa matriz float32 pré-alocada (dobra quando
+    enche); a busca é um único produto matriz-vetor.
+
+    embedder: qualquer objeto com embed(texts) (OllamaEmbeddings, CachedEmbedder, ...).
+    """
+    def __init__(self, embedder, threshold: float = 0.92, capacity: int = 256):
+        self.embedder = embedder
+        self.threshold = threshold
+        self._capacity = capacity
+        # namespace -> (matriz [capacity, dim], n usados, valores)
+        self._spaces: Dict[str, Tuple[np.ndarray, int, List[Any]]] = {}
+        self._lock = threading.Lock()
+
+    def embed(self, text: str) -> np.ndarray:
+        vec = np.asarray(self.embedder.embed([text])[0], dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else vec
+
+    def lookup(self, namespace: str, vec: np.ndarray) -> Tuple[Optional[Any], float]:
+        """(valor, similaridade) da entrada mais próxima, ou (None, melhor similaridade)."""
+        with self._lock:
+            space = self._spaces.get(namespace)
+            if space is None or space[1] == 0:
+                return None, 0.0
+            matrix, n, values = space
+            sims = matrix[:n] @ vec
+        best = int(np.argmax(sims))
+        sim = float(sims[best])
+        return (values[best], sim) if sim >= self.threshold else (None, sim)
+
+    def add(self, namespace: str, vec: np.ndarray, value: Any) -> None:
+        with self._lock:
+            matrix, n, values = self._spaces.get(namespace) or (
+                np.empty((self._capacity, vec.shape[0]), dtype=np.float32), 0, [])
+            if n == matrix.shape[0]:
+                grown = np.empty((2 * n, matrix.shape[1]), dtype=np.float32)
+                grown[:n] = matrix
+                matrix = grown
+            matrix[n] = vec
+            values.append(value)
+            self._spaces[namespace] = (matrix, n + 1, values)
+
+    def __len__(self) -> int:
+        return sum(n for _m, n, _v in self._spaces.values())
@@ -1,13 +1,22 @@
 # src/tools/duckduckgo_scraper.py
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 import re
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 from markdownify import markdownify as convert
 
 
+# page fetches are I/O bound: threads overlap them (the GIL is released on socket reads)
+MAX_FETCH_WORKERS = 8
+# keep-alive pool per scraper: hosts kept / connections per host (>= MAX_FETCH_WORKERS)
+POOL_SIZE = 16
+
+
 class DuckDuckGoScraper:
     """
     Lightweight wrapper around DuckDuckGo search + HTML scraping → Markdown.
@@ -24,6 +33,15 @@ class DuckDuckGoScraper:
         self.timeout = timeout
         self.delay = delay
         self.session = requests.Session()
+        # connections (and TLS sessions) are reused across fetches; transient errors retried twice
+        adapter = HTTPAdapter(
+            pool_connections=POOL_SIZE,
+            pool_maxsize=POOL_SIZE,
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+                              allowed_methods=frozenset({"GET", "HEAD"})),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update({
             'User-Agent': user_agent or (
                 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
@@ -83,6 +101,25 @@ class DuckDuckGoScraper:
         except Exception:
             return None
 
+    def extract_many(self, urls: List[str], max_workers: int = MAX_FETCH_WORKERS) -> List[Optional[str]]:
+        """
+        extract_content for several URLs concurrently; results keep the input order.
+        `delay` still spaces out request starts: the i-th fetch starts i * delay after
+        the batch started (sleeps are measured from t0, so they don't add up per worker).
+        """
+        if not urls:
+            return []
+        t0 = time.monotonic()
+
+        def fetch(indexed):
+            i, url = indexed
+            if i and self.delay > 0:
+                time.sleep(max(0.0, t0 + i * self.delay - time.monotonic()))
+            return self.extract_content(url)
+
+        with ThreadPoolExecutor(max_workers=min(len(urls), max_workers)) as ex:
+            return list(ex.map(fetch, enumerate(urls)))
+
     def load_url(self, url: str) -> Dict[str, str]:
         """
         Convenience: load a single URL and return {'url','content'}.
@@ -92,18 +129,16 @@ class DuckDuckGoScraper:
 
     def scrape_search_results(self, query: str, max_results: int = 10) -> List[Dict[str, str]]:
         """
-        Convenience: search then scrape each result.
+        Convenience: search then scrape the results concurrently (see extract_many).
         """
         items = self.search_duckduckgo(query=query, max_results=max_results)
-        out: List[Dict[str, str]] = []
-        for i, item in enumerate(items, 1):
-            content = self.extract_content(item["url"])
-            out.append({
+        contents = self.extract_many([item["url"] for item in items])
+        return [
+            {
                 "title": item["title"],
                 "url": item["url"],
                 "snippet": item["snippet"],
                 "content": content or "Failed to extract content"
-            })
-            if i < len(items) and self.delay > 0:
-                time.sleep(self.delay)
-        return out
+            }
+            for item, content in zip(items, contents)
+        ]
@@ -0,0 +1,57 @@
+"""
+On-disk cache for deterministic (temperature == 0) Ollama chat calls in tests.
+
+Responses are stored under .pytest_cache/llm/<sha256>.json, keyed on
+(model, model digest, messages, options). The digest comes from the server's
+model list, so after `ollama pull` moves a tag the old replies stop matching;
+a model whose digest can't be read is never served from the cache.
+Re-running the suite returns the stored reply instead of generating it again.
+Set LLM_TEST_CACHE=0 to bypass the cache.
+"""
+import hashlib
+import json
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".pytest_cache" / "llm"
+# bump to drop every stored reply (e.g. after changing what goes into the key)
+CACHE_VERSION = 2
+
+# server base URL -> {model name: digest}, one /api/tags request per server and run
+_DIGESTS = {}
+
+
+def model_digest(client, model):
+    """Digest of the model the tag currently points to on client's server, or None."""
+    host = str(getattr(getattr(client, "_client", None), "base_url", ""))
+    if host not in _DIGESTS:
+        try:
+            models = client.list()["models"]
+            _DIGESTS[host] = {(m.get("model") or m.get("name")): m.get("digest") for m in models}
+        except Exception:
+            _DIGESTS[host] = {}
+    name = model if ":" in model else f"{model}:latest"
+    return _DIGESTS[host].get(name)
+
+
+def cache_key(model, digest, messages, options):
+    blob = json.dumps({"v": CACHE_VERSION, "model": model, "digest": digest,
+                       "messages": messages, "options": options or {}},
+                      sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _to_dict(response):
+    if hasattr(response, "model_dump"):
+        return response.model_dump(mode="json")
+    return dict(response)
+
+
+def cached_chat(chat_fn, client, model, digest, messages, options, **kwargs):
+    """Return the cached reply for this request, calling chat_fn(client, ...) on a miss."""
+    path = CACHE_DIR / f"{cache_key(model, digest, messages, options)}.json"
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    data = _to_dict(chat_fn(client, model=model, messages=messages, options=options, stream=False, **kwargs))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, ensure_ascii=False, default=str), encoding="utf-8")
+    return data
@@ -0,0 +1,373 @@
+"""
+Shared pytest configuration.
+
+The suite can run in parallel with pytest-xdist:
+
+    pytest -n auto --maxprocesses=4
+
+Each worker may target its own Ollama instance via OLLAMA_HOST_GW0,
+OLLAMA_HOST_GW1, ... (see tests.test_utils.get_worker_ollama_host). With a
+single Ollama server, keep --maxprocesses low to avoid loading the model
+more times than the GPU/RAM can hold, and start the server with
+OLLAMA_NUM_PARALLEL >= workers so it serves their requests concurrently
+(it's a server setting; exporting it here has no effect).
+
+Test diagnostics go through logging (not print); PYTEST_LOG_LEVEL=DEBUG
+together with `-o log_cli=true` shows them live.
+"""
+import logging
+import os
+from pathlib import Path
+
+import pytest
+
+from tests._llm_cache import cached_chat, model_digest
+from tests.test_utils import (
+    TEST_KEEP_ALIVE,
+    databases_skip_reason as _databases_skip_reason,
+    get_worker_ollama_host,
+    make_cfg,
+    ollama_skip_reason,
+    probe_services,
+    setup_test_environment,
+)
+
+logging.basicConfig(level=os.environ.get("PYTEST_LOG_LEVEL", "WARNING").upper())
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "ollama: needs a running Ollama server (skipped when OLLAMA_MODEL is empty)")
+    config.addinivalue_line(
+        "markers",
+        "databases: needs reachable MongoDB and Qdrant (tests.test_utils.SKIP_IF_NO_DATABASES)",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip every @pytest.mark.ollama test in one pass when Ollama tests are disabled."""
+    reason = ollama_skip_reason()
+    if reason is None:
+        return
+    skip = pytest.mark.skip(reason=reason)
+    for item in items:
+        if item.get_closest_marker("ollama"):
+            item.add_marker(skip)
+
+
+def pytest_runtest_setup(item):
+    """
+    Apply @SKIP_IF_NO_DATABASES (the "databases" marker) before any fixture is set up;
+    the probe runs the first time a marked test is reached, never at import.
+    """
+    if item.get_closest_marker("databases"):
+        reason = _databases_skip_reason()
+        if reason:
+            pytest.skip(reason)
+
+
+@pytest.fixture(scope="session")
+def services_up():
+    """{"qdrant": bool, "mongo": bool, "ollama": bool, ["qdrant_grpc": bool,] "all": bool} from the session TCP probes."""
+    up = {name: ok for name, (ok, _line) in probe_services().items()}
+    up["all"] = all(up.values())
+    return up
+
+
+@pytest.fixture(scope="session", autouse=True)
+def setup_prompts():
+    """Point PROMPT_DIR at the repo prompts/ directory once for the whole session."""
+    return setup_test_environment()
+
+
+# Prompts written once per session and shared by the tests that point PROMPT_DIR at them.
+SHARED_PROMPTS = {
+    # força saída com cerca de código e espaços variados (test_pattern_display_unwrap)
+    "writer_unwrap.md": (
+        "You are a helpful assistant.\n"
+        "When the user says anything, return the following EXACT format including the triple backticks:\n\n"
+        "```\n"
+        "Line 1: Hello, API telemetry!\n"
+        "\n"
+        "   Line 2 with trailing spaces   \n"
+        "```\n\n"
+        "IMPORTANT: Include the triple backticks (```) at the beginning and end."
+    ),
+    # writer e juiz de avaliação (test_pattern_metrics_eval)
+    "tech_writer.md": (
+        "You are a senior software engineer.\n"
+        "Produce a concise technical bullet list only.\n\nINPUT:\n{message_text}\n"
+    ),
+    "eval_judge.md": (
+        "You are a reliable evaluation judge.\n\n"
+        "### CASE\n{case_md}\n\n"
+        "### MODEL OUTPUT\n{model_output_md}\n\n"
+        "### DECISION RULES\n- PASS if output mentions API and telemetry\n\n"
+        "### OUTPUT\n"
+        "### VERDICT\nPASS\n\n"
+        "### REASONS\n- mentions API and telemetry\n"
+    ),
+}
+
+
+@pytest.fixture(scope="session")
+def shared_prompts_dir(tmp_path_factory):
+    """Directory with SHARED_PROMPTS written once per session. Use with monkeypatch.setenv("PROMPT_DIR", ...)."""
+    d = tmp_path_factory.mktemp("prompts")
+    for name, text in SHARED_PROMPTS.items():
+        (d / name).write_text(text, encoding="utf-8")
+    return d
+
+
+@pytest.fixture
+def prompt_dir(tmp_path, monkeypatch):
+    """Empty per-test prompts directory with PROMPT_DIR pointed at it; tests write the .md files they need."""
+    d = tmp_path / "prompts"
+    d.mkdir()
+    monkeypatch.setenv("PROMPT_DIR", str(d))
+    return d
+
+
+class FakeStream:
+    """Chunk iterator like ollama's stream=True response; records what was pulled and close()."""
+    def __init__(self, pieces):
+        self._pieces = iter(pieces)
+        self.pulled = []
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        piece = next(self._pieces)
+        self.pulled.append(piece)
+        return {"message": {"content": piece}}
+
+    def close(self):
+        self.closed = True
+
+
+class FakeOllamaClient:
+    """
+    Stand-in for ollama.Client, passed as model_config["client"]. Records every chat()
+    call's kwargs; answers `reply`, or streams `pieces` when called with stream=True.
+    """
+    def __init__(self, reply="ok", pieces=()):
+        self.reply = reply
+        self.pieces = list(pieces)
+        self.calls = []
+        self.streams = []
+
+    def chat(self, **kwargs):
+        self.calls.append(kwargs)
+        if kwargs.get("stream"):
+            self.streams.append(FakeStream(self.pieces))
+            return self.streams[-1]
+        return {"message": {"role": "assistant", "content": self.reply}}
+
+
+@pytest.fixture
+def fake_client():
+    """A fresh FakeOllamaClient (set .reply / .pieces before the agent runs)."""
+    return FakeOllamaClient()
+
+
+@pytest.fixture(autouse=True)
+def _llm_response_cache(monkeypatch):
+    """
+    Serve temperature == 0 ollama.Client.chat calls from tests/_llm_cache, keyed on the
+    model's digest so a re-pulled tag starts fresh (LLM_TEST_CACHE=0 disables).
+    """
+    if os.environ.get("LLM_TEST_CACHE", "1") == "0":
+        return
+    try:
+        import ollama
+    except ImportError:
+        return
+    original = ollama.Client.chat
+
+    def chat(self, model="", messages=None, *, options=None, stream=False, **kwargs):
+        deterministic = not stream and (options or {}).get("temperature") == 0
+        digest = model_digest(self, model) if deterministic else None
+        if digest is None:
+            return original(
+                self, model=model, messages=messages, options=options, stream=stream, **kwargs
+            )
+        return cached_chat(original, self, model, digest, messages, options, **kwargs)
+
+    monkeypatch.setattr(ollama.Client, "chat", chat)
+
+
+@pytest.fixture(scope="module")
+def ollama_client():
+    """One ollama.Client per test module, so LLM calls reuse the same HTTP connection pool."""
+    ollama = pytest.importorskip("ollama")
+    from src.config.settings import Settings
+    return ollama.Client(host=get_worker_ollama_host() or Settings().ollama_host, timeout=60)
+
+
+@pytest.fixture(scope="module")
+def warm_prompt_cache(ollama_client):
+    """
+    Returns warm(prompt_files, model): sends each system prompt once with
+    num_predict=1 so Ollama already holds its static prefix when the test runs.
+    Prompts keep their {placeholders} at the end, so the cached prefix matches.
+    Errors are ignored; the test itself reports an unreachable server.
+    """
+    from src.core.agent import AgentConfig, _load_system_prompt_from_config
+
+    warmed = set()
+
+    def warm(prompt_files, model):
+        for pf in prompt_files:
+            if (pf, model) in warmed:
+                continue
+            try:
+                system = _load_system_prompt_from_config(AgentConfig(name="warmup", prompt_file=pf))
+                ollama_client.chat(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system},
+                        {"role": "user", "content": ""},
+                    ],
+                    options={"num_predict": 1},
+                    keep_alive=TEST_KEEP_ALIVE,
+                )
+                warmed.add((pf, model))
+            except Exception:
+                pass
+
+    return warm
+
+
+@pytest.fixture(scope="module")
+def _switcher_writer_wm(ollama_client):
+    from src.core.agent import AgentConfig, LLMAgent
+    from src.core.workflow_manager import WorkflowManager
+    from src.agents.prompt_switcher import PromptAgent
+
+    # prompt_agent.md asks for a PLAN, so the switch decision goes through the LLM
+    switcher = PromptAgent(AgentConfig(
+        name="PromptSwitcher",
+        model_config={"prompt_file": "prompt_agent.md",
+                      **make_cfg(ollama_client, "standard", temperature=0.0)},
+    ))
+    writer = LLMAgent(AgentConfig(
+        name="Writer",
+        prompt_file="writer_bullets.md",
+        model_config=make_cfg(ollama_client, "tiny", temperature=0.1, max_tokens=128),
+    ))
+    return WorkflowManager({"PromptSwitcher": ["Writer"], "Writer": []},
+                           {"PromptSwitcher": switcher, "Writer": writer})
+
+
+@pytest.fixture
+def switcher_writer_wm(_switcher_writer_wm):
+    """
+    PromptAgent (prompt_agent.md, LLM decision) -> Writer workflow built once
+    per module. Prompt overrides
+    stick to the agents' configs, so Writer is reset to its baseline
+    writer_bullets.md before each test.
+    """
+    _switcher_writer_wm.agents["Writer"].config.prompt_file = "writer_bullets.md"
+    return _switcher_writer_wm
+
+
+# Documents seeded into the RAG test collection (tag drives the context headers).
+RAG_DOCS = [
+    ("Events include page views, taps, custom milestones with timestamps.", {"tag": "C1"}),
+    ("Funnels are built from ordered events to measure drop-offs.", {"tag": "C2"}),
+    # specific fact the RAG test can validate against
+    (
+        "The capital of France is located in Beijing, China according to our test database.",
+        {"tag": "GEOGRAPHY"},
+    ),
+]
+
+
+@pytest.fixture(scope="session")
+def mongo_client():
+    """One MongoClient (connection pool) for the whole session."""
+    from pymongo import MongoClient
+    from src.config.settings import get_settings
+
+    client = MongoClient(get_settings().mongo_uri)
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def qdrant_client():
+    """
+    One QdrantClient for the session, configured like the app (settings.qdrant_prefer_grpc):
+    HTTP by default, gRPC with QDRANT_PREFER_GRPC=1 (the gRPC port is then probed too).
+    """
+    from qdrant_client import QdrantClient
+    from src.config.settings import get_settings
+
+    settings = get_settings()
+    client = QdrantClient(url=settings.qdrant_url, prefer_grpc=settings.qdrant_prefer_grpc,
+                          grpc_port=settings.qdrant_grpc_port)
+    yield client
+    getattr(client, "close", lambda: None)()  # close() only exists in newer qdrant-client
+
+
+EMBED_CACHE = (
+    Path(__file__).resolve().parent.parent / ".pytest_cache" / "embed" / "embeddings.sqlite"
+)
+
+
+# Directory with model.onnx + tokenizer.json: embed locally with ONNX Runtime instead of Ollama
+EMBED_ONNX_MODEL = os.environ.get("EMBED_ONNX_MODEL", "")
+
+
+def _base_embedder():
+    from src.memory.embeddings import OllamaEmbeddings
+    if not EMBED_ONNX_MODEL:
+        return OllamaEmbeddings()
+    from src.memory.onnx_embedder import OnnxEmbedder, quantize_model
+    model_dir = Path(EMBED_ONNX_MODEL)
+    # int8 dynamic quantization, produced once and reused by later runs
+    quantize_model(model_dir / "model.onnx", model_dir / "model_quantized.onnx")
+    return OnnxEmbedder(model_dir)
+
+
+@pytest.fixture(scope="session")
+def embedder():
+    """
+    Shared OllamaEmbeddings (or OnnxEmbedder with EMBED_ONNX_MODEL) behind an on-disk
+    CachedEmbedder, so constant documents/queries are embedded once across runs
+    (EMBED_TEST_CACHE=0 disables).
+    """
+    from src.memory.embeddings import CachedEmbedder
+    if os.environ.get("EMBED_TEST_CACHE", "1") == "0":
+        yield _base_embedder()
+        return
+    cached = CachedEmbedder(_base_embedder(), EMBED_CACHE)
+    yield cached
+    cached.close()
+
+
+@pytest.fixture(scope="session")
+def route_cache(embedder):
+    """Session SemanticCache for SwitchAgent LLM routing: near-duplicate texts reuse a decision."""
+    from src.memory.semantic_cache import SemanticCache
+    return SemanticCache(embedder, threshold=0.92)
+
+
+@pytest.fixture(scope="session")
+def rag_memory(mongo_client, qdrant_client, embedder):
+    """MemoryManager over MongoSTM + QdrantVectorStore('test_docs_rag'), built once and seeded only if empty."""
+    from src.memory.mongo_stm import MongoSTM
+    from src.memory.qdrant_store import QdrantVectorStore
+    from src.memory.memory_manager import MemoryManager
+
+    stm = MongoSTM(client=mongo_client)
+    # vector size depends on the embedder, so ONNX runs get their own collection
+    collection = "test_docs_rag_onnx" if EMBED_ONNX_MODEL else "test_docs_rag"
+    ltm = QdrantVectorStore(collection=collection, client=qdrant_client, embedder=embedder)
+    memory = MemoryManager(stm, ltm)
+    if ltm.count() == 0:
+        texts, metas = zip(*RAG_DOCS)
+        memory.index_documents(list(texts), list(metas))
+    return memory
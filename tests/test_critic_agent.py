@@ -8,7 +8,7 @@ from src.core.types import Message, Result
 from src.agents.critic_agent import CriticAgent
 from src.core.workflow_manager import WorkflowManager
 from src.core.agent import BaseAgent
-from tests.test_utils import setup_prompts, get_test_model_config, skip_if_no_ollama
+from tests.test_utils import get_test_model_config
 
 
 # --- dummies de LLM para o crítico ---
@@ -35,7 +35,7 @@ class DoneAgent(BaseAgent):
 
 # ------------------ TESTES ----------------------
 
-def test_critic_repeat_on_low_score(setup_prompts):
+def test_critic_repeat_on_low_score():
     critic = CriticAgent(AgentConfig(
         name="Critic",
         prompt_file="critic_agent.md",
@@ -53,7 +53,7 @@ def test_critic_repeat_on_low_score(setup_prompts):
     assert res.output["score"] < 7.5
 
 
-def test_critic_goto_on_pass(setup_prompts):
+def test_critic_goto_on_pass():
     critic = CriticAgent(AgentConfig(
         name="Critic",
         prompt_file="critic_agent.md",
@@ -71,7 +71,7 @@ def test_critic_goto_on_pass(setup_prompts):
     assert res.output["score"] >= 7.5
 
 
-def test_critic_invalid_markdown_triggers_repeat(setup_prompts):
+def test_critic_invalid_markdown_triggers_repeat():
     critic = CriticAgent(AgentConfig(
         name="Critic",
         prompt_file="critic_agent.md",
@@ -88,7 +88,7 @@ def test_critic_invalid_markdown_triggers_repeat(setup_prompts):
     assert res.control.get("repeat") is True
 
 
-def test_integration_writer_critic_flow(setup_prompts):
+def test_integration_writer_critic_flow():
     writer = LLMAgent(AgentConfig(name="Writer", prompt_file="tech_writer.md"))
     # Override writer for testing
     writer.run = lambda msg: Result.ok(output={"text": writer_llm(msg.data["user_prompt"])})
@@ -126,8 +126,8 @@ def create_ollama_llm_agent() -> LLMAgent:
     return LLMAgent(config)
 
 # --- Test with real Ollama ---
-@skip_if_no_ollama()
-def test_critic_agent_with_ollama(setup_prompts):
+@pytest.mark.ollama
+def test_critic_agent_with_ollama():
     """Test CriticAgent using LLMAgent with real Ollama integration."""
     
     # Create LLMAgent that uses real Ollama
@@ -25,7 +25,7 @@ from demo_code_executor import (
     parse_arguments,
     should_use_real_llm
 )
-from tests.test_utils import skip_if_no_ollama, setup_test_environment
+from tests.test_utils import setup_test_environment
 
 
 class TestDemoCodeExecutor:
@@ -161,7 +161,7 @@ class TestDemoCodeExecutor:
             except Exception as e:
                 pytest.fail(f"demo_task_execution failed in mock mode: {e}")
     
-    @skip_if_no_ollama()
+    @pytest.mark.ollama
     def test_demo_task_execution_real_llm_mode(self):
         """Test demo_task_execution in real LLM mode (requires Ollama)"""
         # This test will be skipped if Ollama is not available
@@ -3,9 +3,9 @@ from pathlib import Path
 
 from src.app.flows import make_prompt_handoff_flow, make_guardrails_writer_flow
 from src.core.workflow_manager import WorkflowManager
-from tests.test_utils import skip_if_no_ollama, get_test_model_config
+from tests.test_utils import get_test_model_config
 
-@skip_if_no_ollama()
+@pytest.mark.ollama
 def test_flows_prompt_handoff_and_guardrails(tmp_path, monkeypatch):
     # prompts em arquivos
     prompts = tmp_path / "prompts"
@@ -67,3 +67,18 @@ def test_flows_prompt_handoff_and_guardrails(tmp_path, monkeypatch):
     out2 = wm2.run_workflow("Guardrails", {"text": "Email me at a@a.com. Draft the plan."})
     texts2 = [r.output.get("text") for r in out2 if isinstance(r.output, dict) and "text" in r.output]
     assert any(isinstance(t, str) and t.strip() for t in texts2)
+
+
+def test_flow_builder_manager_snapshots_the_graph():
+    from src.app.flows import FlowBuilder
+    from src.agents.echo import EchoAgent
+    from src.core.agent import AgentConfig
+
+    fb = FlowBuilder().add("A", EchoAgent(AgentConfig(name="A"))).add("B", EchoAgent(AgentConfig(name="B")))
+    fb.chain("A", "B")
+    wm = fb.manager()
+    fb.connect("B", "A")  # later edits to the builder don't reach the existing manager
+
+    assert fb.graph["B"] == ["A"]
+    assert wm.graph == {"A": ["B"], "B": []}
+    assert list(wm.run_workflow("A", "x").by_node) == ["A", "B"]  # B is still the sink: no loop back
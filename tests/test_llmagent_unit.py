@@ -0,0 +1,135 @@
+import os
+import pytest
+
+from src.core.agent import AgentConfig, LLMAgent
+from src.core.types import Message
+from tests.test_utils import get_test_model_config, make_cfg
+
+
+@pytest.fixture
+def writer_prompt(prompt_dir):
+    (prompt_dir / "simple_writer.md").write_text("You are a helpful assistant.", encoding="utf-8")
+    return "simple_writer.md"
+
+
+def _writer(prompt_file, **model_config):
+    return LLMAgent(AgentConfig(name="Writer", prompt_file=prompt_file, model_config=model_config))
+
+
+def test_llmagent_stream_stops_on_pattern(writer_prompt, fake_client):
+    fake_client.pieces = ["Track ", "API ", "latency ", "and ", "errors."]
+    ag = _writer(writer_prompt, client=fake_client)
+    text = ag.stream("Describe telemetry.", r"\bapi\b")
+
+    assert text == "Track API "
+    assert fake_client.calls[0]["stream"] is True
+    assert fake_client.streams[0].pulled == ["Track ", "API "]
+    assert fake_client.streams[0].closed
+    assert "stop_regex" not in ag.config.model_config
+
+    # per-call override by agent name (EvaluationRunner early stop); config untouched
+    from src.core.agent import stop_regex_for
+    with stop_regex_for(["Writer"], r"\blatency\b"):
+        res = ag.run(Message(data={"user_prompt": "Describe telemetry."}))
+    assert res.output["text"] == "Track API latency "
+    assert res.metrics["early_stopped"] is True
+    assert "stop_regex" not in ag.config.model_config
+
+
+def test_get_ollama_client_is_shared_per_host():
+    from src.core.agent import get_ollama_client
+
+    a = get_ollama_client("http://ollama-a:11434")
+    assert get_ollama_client("http://ollama-a:11434") is a
+    assert get_ollama_client("http://ollama-b:11434") is not a
+
+
+def test_llmagent_forwards_keep_alive(writer_prompt, fake_client):
+    ag = _writer(writer_prompt, client=fake_client, keep_alive="30m")
+    res = ag.execute(Message(data={"user_prompt": "hi"}))
+
+    assert res.success and res.output["text"] == "ok"
+    assert fake_client.calls[0]["keep_alive"] == "30m"
+
+
+def test_llmagent_forwards_num_predict_from_test_config(writer_prompt, fake_client):
+    ag = _writer(writer_prompt, **make_cfg(fake_client, temperature=0.3, max_tokens=64))
+    ag.execute(Message(data={"user_prompt": "hi"}))
+
+    assert fake_client.calls[0]["options"]["num_predict"] == 64
+    assert fake_client.calls[0]["options"]["temperature"] == 0.3
+
+
+def test_cached_chat_reuses_stored_response(tmp_path, monkeypatch):
+    import tests._llm_cache as llm_cache
+
+    monkeypatch.setattr(llm_cache, "CACHE_DIR", tmp_path / "llm")
+    calls = []
+
+    def chat_fn(client, **kwargs):
+        calls.append(kwargs)
+        return {"message": {"role": "assistant", "content": "cached"}}
+
+    messages = [{"role": "user", "content": "hi"}]
+    first = llm_cache.cached_chat(chat_fn, None, "m", "d1", messages, {"temperature": 0})
+    second = llm_cache.cached_chat(chat_fn, None, "m", "d1", messages, {"temperature": 0})
+    llm_cache.cached_chat(chat_fn, None, "m", "d1", messages, {"temperature": 0, "top_p": 0.5})
+    # same tag re-pulled (new digest): not served from the old entry
+    llm_cache.cached_chat(chat_fn, None, "m", "d2", messages, {"temperature": 0})
+
+    assert first == second == {"message": {"role": "assistant", "content": "cached"}}
+    assert len(calls) == 3
+
+
+def test_model_digest_reads_the_server_model_list(monkeypatch):
+    import tests._llm_cache as llm_cache
+
+    monkeypatch.setattr(llm_cache, "_DIGESTS", {})
+
+    class ListingClient:
+        lists = 0
+        def list(self):
+            ListingClient.lists += 1
+            return {"models": [{"model": "llama3.2:1b", "digest": "abc"}, {"model": "qwen:latest", "digest": "def"}]}
+
+    client = ListingClient()
+    assert llm_cache.model_digest(client, "llama3.2:1b") == "abc"
+    assert llm_cache.model_digest(client, "qwen") == "def"
+    assert llm_cache.model_digest(client, "missing:7b") is None  # never cached
+    assert ListingClient.lists == 1
+
+
+def test_prompt_loader_caches_until_file_changes(prompt_dir):
+    from src.core.agent import _load_system_prompt_from_config
+
+    prompt = prompt_dir / "cached.md"
+    prompt.write_text("v1", encoding="utf-8")
+    cfg = AgentConfig(name="Writer", prompt_file="cached.md")
+
+    assert _load_system_prompt_from_config(cfg) == "v1"
+    assert _load_system_prompt_from_config(cfg) == "v1"
+
+    prompt.write_text("v2", encoding="utf-8")
+    st = prompt.stat()
+    os.utime(prompt, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert _load_system_prompt_from_config(cfg) == "v2"
+
+    # same mtime (coarse timestamps), different size: still re-read
+    mtime = prompt.stat().st_mtime_ns
+    prompt.write_text("v3 longer", encoding="utf-8")
+    os.utime(prompt, ns=(mtime, mtime))
+    assert _load_system_prompt_from_config(cfg) == "v3 longer"
+
+
+def test_frozen_test_model_config_is_shared_and_read_only():
+    from tests.test_utils import frozen_test_model_config
+
+    view = frozen_test_model_config("tiny")
+    assert view is frozen_test_model_config("tiny")
+    assert "num_predict" not in view["options"]  # uncapped unless a test passes max_tokens
+    with pytest.raises(TypeError):
+        view["options"]["temperature"] = 1.0
+
+    mutable = get_test_model_config("tiny")
+    mutable["options"]["temperature"] = 1.0
+    assert view["options"]["temperature"] == 0.1
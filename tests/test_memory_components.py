@@ -4,12 +4,12 @@ Tests for memory components: MongoSTM, QdrantVectorStore, and MemoryManager
 import pytest
 import os
 from typing import Dict, Any
-from tests.test_utils import get_test_database_config, skip_if_no_databases
+from tests.test_utils import get_test_database_config, SKIP_IF_NO_DATABASES
 
 # Get database configuration from centralized settings
 db_config = get_test_database_config()
 
-@skip_if_no_databases()
+@SKIP_IF_NO_DATABASES
 class TestMongoSTM:
     """Test Short Term Memory (STM) with MongoDB"""
     
@@ -92,7 +92,7 @@ class TestMongoSTM:
         assert recent_2[0]["content"] == "Message for session 2"
 
 
-@skip_if_no_databases()
+@SKIP_IF_NO_DATABASES
 class TestQdrantVectorStore:
     """Test Long Term Memory (LTM) with Qdrant Vector Store"""
     
@@ -182,7 +182,7 @@ class TestQdrantVectorStore:
             assert ("Collection" in error_str and "doesn't exist" in error_str) or "404" in error_str
 
 
-@skip_if_no_databases()
+@SKIP_IF_NO_DATABASES
 class TestMemoryManager:
     """Test MemoryManager integration of STM and LTM"""
     
@@ -283,4 +283,192 @@ def test_memory_environment_check():
     print(f"   ✅ Using centralized configuration from settings.py")
     
     # This test always passes, it's just for information
-    assert True
\ No newline at end of file
+    assert True
+
+
+class TestBatchIndexing:
+    """Batch indexing without external services (requests/LTM faked)"""
+
+    def test_embed_sends_one_request_for_all_texts(self, monkeypatch):
+        from src.memory import embeddings
+
+        calls = []
+
+        class Resp:
+            status_code = 200
+            text = ""
+            def raise_for_status(self):
+                pass
+            def json(self):
+                return {"embeddings": [[0.1], [0.2]]}
+
+        def fake_post(url, json=None, timeout=None):
+            calls.append((url, json))
+            return Resp()
+
+        monkeypatch.setattr(embeddings.requests, "post", fake_post)
+        vecs = embeddings.OllamaEmbeddings(model="m", host="http://h").embed(["a", "b"])
+
+        assert vecs == [[0.1], [0.2]]
+        assert calls == [("http://h/api/embed", {"model": "m", "input": ["a", "b"]})]
+
+    def test_index_documents_single_index_call(self):
+        from src.memory.memory_manager import MemoryManager
+
+        class FakeLTM:
+            def __init__(self):
+                self.batches = []
+            def index_texts(self, items):
+                self.batches.append(items)
+
+        ltm = FakeLTM()
+        MemoryManager(stm=None, ltm=ltm).index_documents(["doc one", "doc two"], [{"tag": "C1"}, None])
+
+        assert ltm.batches == [[{"text": "doc one", "meta": {"tag": "C1"}}, {"text": "doc two", "meta": {}}]]
+
+    def test_search_reuses_cached_query_embedding(self):
+        from types import SimpleNamespace
+        from src.memory.qdrant_store import QdrantVectorStore
+
+        embedded = []
+
+        class FakeEmbedder:
+            def embed(self, texts):
+                embedded.extend(texts)
+                return [[0.5, 0.5] for _ in texts]
+
+        class FakeClient:
+            def query_points(self, **kwargs):
+                return SimpleNamespace(points=[])
+
+        store = QdrantVectorStore(collection="unused", client=FakeClient(), embedder=FakeEmbedder())
+        store.search("How are funnels computed?")
+        store.search("How are funnels computed?")
+
+        assert embedded == ["How are funnels computed?"]
+
+    def test_new_collection_is_int8_quantized(self):
+        from types import SimpleNamespace
+        from qdrant_client.models import ScalarType
+        from src.memory.qdrant_store import QdrantVectorStore
+
+        created, queried = [], []
+
+        class FakeEmbedder:
+            def embed(self, texts):
+                return [[0.5, 0.5] for _ in texts]
+
+        class FakeClient:
+            def get_collections(self):
+                return SimpleNamespace(collections=[])
+            def create_collection(self, **kwargs):
+                created.append(kwargs)
+            def upsert(self, **kwargs):
+                pass
+            def query_points(self, **kwargs):
+                queried.append(kwargs)
+                return SimpleNamespace(points=[])
+
+        store = QdrantVectorStore(collection="unused", client=FakeClient(), embedder=FakeEmbedder())
+        store.index_texts([{"text": "doc"}])
+        store.search("q")
+
+        assert created[0]["quantization_config"].scalar.type == ScalarType.INT8
+        assert queried[0]["search_params"].quantization.rescore is True
+
+    def test_search_batch_single_embed_and_query(self):
+        from types import SimpleNamespace
+        from src.core.agent import AgentConfig
+        from src.core.types import Message
+        from src.agents.rag_retriever import RAGRetrieverAgent
+        from src.memory.memory_manager import MemoryManager
+        from src.memory.qdrant_store import QdrantVectorStore
+
+        embed_calls, batch_calls = [], []
+
+        class FakeEmbedder:
+            def embed(self, texts):
+                embed_calls.append(list(texts))
+                return [[float(i), 1.0] for i, _ in enumerate(texts)]
+
+        class FakeClient:
+            def query_batch_points(self, collection_name, requests):
+                batch_calls.append(len(requests))
+                hit = lambda i: SimpleNamespace(payload={"text": f"doc {i}", "meta": {"tag": f"C{i}"}}, score=0.9)
+                return [SimpleNamespace(points=[hit(i)]) for i, _ in enumerate(requests)]
+
+        store = QdrantVectorStore(collection="unused", client=FakeClient(), embedder=FakeEmbedder())
+        retriever = RAGRetrieverAgent(AgentConfig(name="Retriever", model_config={"top_k": 1}), MemoryManager(None, store))
+        results = retriever.run_batch([Message(data={"query": "q1"}), Message(data={"query": "q2"})])
+
+        assert embed_calls == [["q1", "q2"]]
+        assert batch_calls == [2]
+        assert [r.output["contexts_md"] for r in results] == ["#### [C0]\ndoc 0", "#### [C1]\ndoc 1"]
+
+    def test_cached_embedder_computes_only_misses(self, tmp_path):
+        from src.memory.embeddings import CachedEmbedder
+
+        calls = []
+
+        class Inner:
+            model = "m"
+            def embed(self, texts):
+                calls.append(list(texts))
+                return [[float(len(t)), 0.5] for t in texts]
+
+        path = tmp_path / "embed" / "cache.sqlite"
+        cached = CachedEmbedder(Inner(), path)
+        assert cached.embed(["ab", "abc"]) == [[2.0, 0.5], [3.0, 0.5]]
+        assert cached.embed(["abc", "abcd", "ab"]) == [[3.0, 0.5], [4.0, 0.5], [2.0, 0.5]]
+        cached.close()
+
+        # persiste entre instâncias (e entre execuções do pytest)
+        again = CachedEmbedder(Inner(), path)
+        assert again.embed(["abcd"]) == [[4.0, 0.5]]
+        again.close()
+        assert calls == [["ab", "abc"], ["abcd"]]
+
+    def test_cached_embedder_rejects_short_inner_batches(self, tmp_path):
+        from src.memory.embeddings import CachedEmbedder
+
+        class Truncating:
+            model = "m"
+            def embed(self, texts):
+                return [[1.0]] * (len(texts) - 1)
+
+        cached = CachedEmbedder(Truncating(), tmp_path / "cache.sqlite")
+        with pytest.raises(ValueError, match="1 vectors for 2 texts"):
+            cached.embed(["a", "b"])
+        cached.close()
+
+    def test_onnx_embedder_mean_pools_and_normalizes(self):
+        np = pytest.importorskip("numpy")
+        from types import SimpleNamespace
+        from src.memory.onnx_embedder import OnnxEmbedder
+
+        class FakeTokenizer:
+            def encode_batch(self, texts):
+                # 2º texto tem um token de padding
+                return [SimpleNamespace(ids=[1, 2], attention_mask=[1, 1]),
+                        SimpleNamespace(ids=[3, 0], attention_mask=[1, 0])][:len(texts)]
+
+        class FakeSession:
+            def __init__(self):
+                self.batches = 0
+            def get_inputs(self):
+                return [SimpleNamespace(name="input_ids"), SimpleNamespace(name="attention_mask")]
+            def run(self, _outputs, feeds):
+                self.batches += 1
+                # hidden state do token = [id, 0]; padding viraria [100, 100] se não fosse mascarado
+                ids = feeds["input_ids"]
+                hidden = np.stack([ids, np.zeros_like(ids)], axis=-1).astype(np.float32)
+                hidden[feeds["attention_mask"] == 0] = 100.0
+                return [hidden]
+
+        session = FakeSession()
+        emb = OnnxEmbedder("models/mini", batch_size=2, session=session, tokenizer=FakeTokenizer())
+        vecs = emb.embed(["a", "b"])
+
+        assert session.batches == 1
+        assert vecs == [[1.0, 0.0], [1.0, 0.0]]
+        assert emb.model == "onnx:mini"
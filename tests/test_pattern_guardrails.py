@@ -1,13 +1,16 @@
-import os, pytest
+import os, re, pytest
 from pathlib import Path
 
-from src.core.agent import AgentConfig, LLMAgent
-from src.core.workflow_manager import WorkflowManager
-from src.agents.guardrails_agent import GuardrailsAgent
-from tests.test_utils import skip_if_no_ollama, get_test_model_config
+from tests.test_utils import get_test_model_config
 
-@skip_if_no_ollama()
+_REDACT_RE = re.compile(r"\[\[REDACTED:(?:EMAIL|PHONE)\]\]")
+
+@pytest.mark.ollama
 def test_task6_guardrails_with_ollama():
+    from src.core.agent import AgentConfig, LLMAgent
+    from src.core.workflow_manager import WorkflowManager
+    from src.agents.guardrails_agent import GuardrailsAgent
+
     # Use existing prompt files from prompts/ directory
     
     # Get model config from centralized settings
@@ -38,13 +41,8 @@ def test_task6_guardrails_with_ollama():
     results = wm.run_workflow("Guardrails", user_text)
 
     # Deve ter redigido PII em pelo menos uma etapa
-    redacted_present = any(
-        isinstance(r.output, dict) and isinstance(r.output.get("text"), str) and
-        ("[[REDACTED:EMAIL]]" in r.output["text"] or "[[REDACTED:PHONE]]" in r.output["text"])
-        for r in results
-    )
+    redacted_present = any((t := r.text()) and _REDACT_RE.search(t) for r in results)
     assert redacted_present, "Expected PII redaction markers in guardrails output"
 
     # Deve existir texto produzido pelo writer (LLM real)
-    final_texts = [r.output.get("text") for r in results if isinstance(r.output, dict) and "text" in r.output]
-    assert any(isinstance(t, str) and len(t.strip()) > 0 for t in final_texts)
+    assert any((t := r.text()) and t.strip() for r in results)
@@ -1,36 +1,17 @@
 import os, pytest
 from pathlib import Path
 
-from src.core.agent import AgentConfig, LLMAgent
-from src.core.workflow_manager import WorkflowManager
-from src.eval.metrics import MetricsCollector
-from src.eval.evaluation import EvaluationRunner, EvalCase
-from tests.test_utils import skip_if_no_ollama, get_test_model_config
-
-@skip_if_no_ollama()
-def test_task8_metrics_and_eval_with_ollama(tmp_path, monkeypatch):
-    # --- prompts em arquivos ---
-    prompts = tmp_path / "prompts"
-    prompts.mkdir(parents=True, exist_ok=True)
-
-    # Prompt do writer (carregado via prompt_file)
-    (prompts / "tech_writer.md").write_text(
-        "You are a senior software engineer.\n"
-        "Produce a concise technical bullet list only.\n\nINPUT:\n{message_text}\n",
-        encoding="utf-8"
-    )
-    # Prompt do juiz de avaliação (carregado via prompt_file no runner)
-    (prompts / "eval_judge.md").write_text(
-        "You are a reliable evaluation judge.\n\n"
-        "### CASE\n{case_md}\n\n"
-        "### MODEL OUTPUT\n{model_output_md}\n\n"
-        "### DECISION RULES\n- PASS if output mentions API and telemetry\n\n"
-        "### OUTPUT\n"
-        "### VERDICT\nPASS\n\n"
-        "### REASONS\n- mentions API and telemetry\n",
-        encoding="utf-8"
-    )
-    monkeypatch.setenv("PROMPT_DIR", str(prompts))
+from tests.test_utils import get_test_model_config
+
+@pytest.mark.ollama
+def test_task8_metrics_and_eval_with_ollama(shared_prompts_dir, monkeypatch):
+    from src.core.agent import AgentConfig, LLMAgent
+    from src.core.workflow_manager import WorkflowManager
+    from src.eval.metrics import MetricsCollector
+    from src.eval.evaluation import EvaluationRunner, EvalCase
+
+    # --- prompts em arquivos (tech_writer.md / eval_judge.md, ver conftest) ---
+    monkeypatch.setenv("PROMPT_DIR", str(shared_prompts_dir))
 
     model_config = get_test_model_config("standard", temperature=0.1)
     
@@ -69,3 +50,81 @@ def test_task8_metrics_and_eval_with_ollama(tmp_path, monkeypatch):
     summ = metrics.summary()
     assert summ["total_nodes"] >= 1
     assert "avg_latency_sec" in summ
+
+
+def test_llm_judge_batches_cases_into_single_call(fake_client):
+    from src.core.agent import AgentConfig, BaseAgent
+    from src.core.types import Result
+    from src.core.workflow_manager import WorkflowManager
+    from src.eval.metrics import MetricsCollector
+    from src.eval.evaluation import EvaluationRunner, EvalCase
+
+    class FixedWriter(BaseAgent):
+        def run(self, message):
+            return Result.ok(output={"text": f"API telemetry for {message.data['text']}"})
+
+    fake_client.reply = (
+        "### VERDICT 1\nPASS\n\n### REASONS 1\n- mentions API\n\n"
+        "### VERDICT 2\nFAIL\n\n### REASONS 2\n- off topic\n"
+    )
+
+    wm = WorkflowManager({"Writer": []}, {"Writer": FixedWriter(AgentConfig(name="Writer"))})
+    cases = [
+        EvalCase(case_id="c1", entry_node="Writer", input_data={"text": "one"}),
+        EvalCase(case_id="c2", entry_node="Writer", input_data={"text": "two"}),
+    ]
+    res = EvaluationRunner(wm, MetricsCollector()).run(cases, judge="llm", llm_model_cfg={"client": fake_client})
+
+    assert len(fake_client.calls) == 1
+    system, user = fake_client.calls[0]["messages"]
+    assert "### VERDICT i" in system["content"]  # prompts/eval_judge_batch.md
+    assert "### CASE 1" in user["content"] and "### CASE 2" in user["content"]
+    assert [r["verdict"] for r in res] == ["PASS", "FAIL"]
+    assert res[0]["reasons"] == ["mentions API"]
+
+
+def test_eval_runner_kwargs_and_judge_failures(fake_client):
+    from src.core.agent import AgentConfig, BaseAgent
+    from src.core.types import Result
+    from src.core.workflow_manager import WorkflowManager
+    from src.eval.metrics import MetricsCollector
+    from src.eval.evaluation import EvaluationRunner, EvalCase
+
+    class FixedWriter(BaseAgent):
+        def run(self, message):
+            return Result.ok(output={"text": "API telemetry"})
+
+    wm = WorkflowManager({"Writer": []}, {"Writer": FixedWriter(AgentConfig(name="Writer"))})
+    runner = EvaluationRunner(wm, MetricsCollector())
+    case = EvalCase(case_id="c1", entry_node="Writer", input_data={"text": "one"}, required_regex="api")
+
+    # batch-only kwargs are accepted on the per-case paths too
+    assert runner.run([case], judge="regex", batch_size=4)[0]["verdict"] == "PASS"
+    fake_client.reply = "### VERDICT\nPASS\n\n### REASONS\n- ok\n"
+    assert runner.run([case], judge="llm", llm_model_cfg={"client": fake_client}, batch_size=4)[0]["verdict"] == "PASS"
+
+    with pytest.raises(ValueError, match="early_stop"):
+        runner.run([case, case], judge="llm", early_stop=True)
+
+    # a judge error (batch and per-case fallback) becomes a FAIL verdict, not an exception
+    class DownClient:
+        def chat(self, **kwargs):
+            raise ConnectionError("ollama down")
+
+    res = runner.run([case, case], judge="llm", llm_model_cfg={"client": DownClient()})
+    assert [r["verdict"] for r in res] == ["FAIL", "FAIL"]
+    assert "Judge LLM failed" in res[0]["reasons"][0]
+
+
+def test_metrics_to_json_roundtrip():
+    import json
+    from src.eval.metrics import MetricsCollector
+
+    metrics = MetricsCollector(run_id="r1")
+    metrics.on_start_node("Writer")
+    metrics.on_end_node("Writer", {"success": True, "metrics": {"latency_sec": 0.5}, "output": {"text": "x"}})
+
+    data = json.loads(metrics.to_json())
+    assert data["summary"] == metrics.summary()
+    assert data["records"][0]["node"] == "Writer"
+    assert data["records"][0]["extra"] == {"has_output_text": True}
@@ -4,9 +4,9 @@ from pathlib import Path
 from src.core.agent import AgentConfig, LLMAgent
 from src.core.workflow_manager import WorkflowManager
 from src.agents.model_selector import ModelSelectorAgent
-from tests.test_utils import skip_if_no_ollama, get_test_model_config
+from tests.test_utils import get_test_model_config
 
-@skip_if_no_ollama()
+@pytest.mark.ollama
 def test_task9_model_selector_applies_overrides(tmp_path, monkeypatch):
     # Get the three different model configurations from settings
     simple_config = get_test_model_config("simple", temperature=0.1)
@@ -5,14 +5,16 @@ from pathlib import Path
 from src.core.agent import AgentConfig, LLMAgent
 from src.core.workflow_manager import WorkflowManager
 from src.agents.prompt_switcher import PromptAgent  # Unified agent (alias for PromptSwitcherAgent)
-from tests.test_utils import skip_if_no_ollama, get_test_model_config
+from tests.test_utils import TEST_TINY_MODEL, skip_if_no_ollama, make_cfg
 
-@skip_if_no_ollama()
-def test_task10_prompt_handoff_with_ollama():
+@pytest.mark.ollama
+@skip_if_no_ollama(TEST_TINY_MODEL)
+def test_task10_prompt_handoff_with_ollama(ollama_client, warm_prompt_cache):
     # Use existing prompts from workspace prompts/ folder
     # No need to create temporary files
 
-    model_config = get_test_model_config("standard", temperature=0.0)
+    model_config = make_cfg(ollama_client, "tiny", temperature=0.0, max_tokens=128)
+    warm_prompt_cache(["prompt_agent.md", "writer_paragraph.md"], model_config["model"])
     
     # ---------- pipeline ----------
     prompt_agent = PromptAgent(AgentConfig(
@@ -4,11 +4,11 @@ from pathlib import Path
 from src.core.agent import AgentConfig, LLMAgent
 from src.core.workflow_manager import WorkflowManager
 from src.agents.query_rewriter import QueryRewriterAgent
-from tests.test_utils import skip_if_no_ollama, get_test_model_config
+from tests.test_utils import make_cfg
 
-@skip_if_no_ollama()
-def test_query_rewriter_ollama():
-    model_config = get_test_model_config("standard", temperature=0.1)
+@pytest.mark.ollama
+def test_query_rewriter_ollama(ollama_client):
+    model_config = make_cfg(ollama_client, "standard", temperature=0.1, max_tokens=64)
 
     # Use existing prompt files from prompts/ directory
 
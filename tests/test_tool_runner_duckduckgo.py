@@ -90,3 +90,41 @@ def test_max_results_limit_enforced(monkeypatch, wm_toolrunner):
     assert res[0].success is True
     # Tool config limit = 5 (see fixture)
     assert recorded["max_seen"] == 5
+
+
+def test_scrape_fetches_urls_concurrently(monkeypatch):
+    import threading
+
+    barrier = threading.Barrier(3, timeout=5)
+
+    def fake_content(self, url):
+        barrier.wait()  # only returns once all three fetches are in flight
+        return f"content for {url}"
+
+    monkeypatch.setattr(DuckDuckGoScraper, "extract_content", fake_content, raising=True)
+    urls = ["https://a.test/", "https://b.test/", "https://c.test/"]
+    contents = DuckDuckGoScraper(delay=0.0).extract_many(urls)
+
+    assert contents == [f"content for {u}" for u in urls]
+
+
+def test_extract_many_spaces_starts_from_batch_start(monkeypatch):
+    import time
+    from src.tools.duckduckgo_scraper import MAX_FETCH_WORKERS
+
+    starts = {}
+
+    def fake_content(self, url):
+        starts[url] = time.monotonic()
+        return url
+
+    monkeypatch.setattr(DuckDuckGoScraper, "extract_content", fake_content, raising=True)
+    delay = 0.05
+    urls = [f"https://{i}.test/" for i in range(MAX_FETCH_WORKERS + 12)]
+    t0 = time.monotonic()
+    assert DuckDuckGoScraper(delay=delay).extract_many(urls) == urls
+
+    # fetch i starts at ~i * delay after the batch start, even past the pool size
+    for i, url in enumerate(urls):
+        offset = starts[url] - t0
+        assert i * delay - 0.01 <= offset < i * delay + 0.1, (i, offset)
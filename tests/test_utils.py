@@ -3,69 +3,239 @@ Test utilities for centralized configuration management.
 """
 import pytest
 import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
+from typing import Final
+from urllib.parse import urlparse
 from src.config.settings import get_settings, get_model_config, should_skip_ollama_test, get_database_config
 
 
-def setup_test_environment():
-    """Set up test environment with proper prompt directory."""
-    prompts_dir = Path(__file__).parent.parent / "prompts"
-    os.environ["PROMPT_DIR"] = str(prompts_dir)
-    return prompts_dir
-
-
-def get_test_model_config(model_type="standard", temperature=0.1, **kwargs):
-    """Get model configuration for tests."""
-    config = get_model_config(model_type)
-    config["options"] = config.get("options", {})
-    config["options"]["temperature"] = temperature
-    
-    # Merge any additional kwargs
-    for key, value in kwargs.items():
-        config[key] = value
-    
-    return config
+# repo prompts/ directory, resolved once at import
+_PROMPTS_DIR_STR = str(Path(__file__).resolve().parent.parent / "prompts")
+_PROMPTS_DIR = Path(_PROMPTS_DIR_STR)
 
 
-def skip_if_no_ollama():
-    """Decorator to skip tests if Ollama is not available."""
-    should_skip, reason = should_skip_ollama_test()
-    return pytest.mark.skipif(should_skip, reason=reason)
+def setup_test_environment():
+    """Set up test environment with proper prompt directory."""
+    # only write (putenv) when something changed PROMPT_DIR since the last call
+    if os.environ.get("PROMPT_DIR") != _PROMPTS_DIR_STR:
+        os.environ["PROMPT_DIR"] = _PROMPTS_DIR_STR
+    return _PROMPTS_DIR
+
+
+def get_worker_ollama_host():
+    """
+    Per-worker Ollama host when running under pytest-xdist.
+    Worker gw0 reads OLLAMA_HOST_GW0, gw1 reads OLLAMA_HOST_GW1, etc.
+    Returns None when not under xdist or no worker-specific host is set.
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if not worker:
+        return None
+    return os.environ.get(f"OLLAMA_HOST_{worker.upper()}") or None
+
+
+TEST_KEEP_ALIVE = os.environ.get("OLLAMA_TEST_KEEP_ALIVE", "30m")
+# 1B tier for dispatch/template-echo tests where output quality doesn't matter
+TEST_TINY_MODEL = os.environ.get("OLLAMA_TINY_MODEL", "llama3.2:1b")
+
+
+@lru_cache(maxsize=None)
+def _cached_model_config(model_type):
+    """Read-only settings-derived config per model tier, built once (env/settings are fixed for the run)."""
+    if model_type == "tiny":
+        config = {**get_model_config("simple"), "model": TEST_TINY_MODEL}
+    else:
+        config = get_model_config(model_type)
+    worker_host = get_worker_ollama_host()
+    if worker_host:
+        config["host"] = worker_host
+    return MappingProxyType(config)
+
+
+@lru_cache(maxsize=None)
+def _cached_db_config():
+    return MappingProxyType(get_database_config())
+
+
+def get_test_model_config(model_type="standard", temperature=0.1, max_tokens=None, **kwargs):
+    """
+    Get model configuration for tests. model_type="tiny" selects OLLAMA_TINY_MODEL;
+    max_tokens caps generation (Ollama num_predict) and is left uncapped by default,
+    since planner/critic/RAG tests parse long structured outputs.
+    """
+    base = _cached_model_config(model_type)
+    options = {**base.get("options", {}), "temperature": temperature}
+    if max_tokens is not None:
+        options["num_predict"] = max_tokens
+    # fresh dicts on every call: agents and workflow overrides mutate model_config in place;
+    # kwargs are merged last and win, as before
+    return {
+        **base,
+        "options": options,
+        # keep the model loaded between the many short test calls
+        "keep_alive": TEST_KEEP_ALIVE,
+        **kwargs,
+    }
+
+
+@lru_cache(maxsize=None)
+def frozen_test_model_config(model_type="standard"):
+    """
+    Read-only default test config for a tier (options included), shared and never copied.
+    For code that only reads it; anything handed to an agent must come from
+    get_test_model_config, since WorkflowManager overrides update model_config in place.
+    """
+    config = get_test_model_config(model_type)
+    return MappingProxyType({**config, "options": MappingProxyType(config["options"])})
+
+
+def make_cfg(client, model_type="standard", temperature=0.1, max_tokens=None, **kwargs):
+    """Test model config that reuses a shared ollama.Client (see the ollama_client fixture)."""
+    return get_test_model_config(model_type, temperature=temperature, max_tokens=max_tokens, client=client, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def _available_models():
+    """
+    Model names served by this run's Ollama, from a single /api/tags request.
+    None if the server can't be asked (tests then run and report the real error).
+    """
+    if not probe_services()["ollama"][0]:
+        return None
+    import requests
+    host = get_worker_ollama_host() or get_settings().ollama_host
+    try:
+        resp = requests.get(f"{host}/api/tags", timeout=1.5)
+        resp.raise_for_status()
+        return frozenset(m["name"] for m in resp.json().get("models", []))
+    except Exception:
+        return None
+
+
+# evaluated once at import. Tests use @pytest.mark.ollama (conftest applies the skip in
+# pytest_collection_modifyitems); SKIP_IF_NO_OLLAMA stays for direct decorator use
+_SHOULD_SKIP_OLLAMA, _OLLAMA_REASON = should_skip_ollama_test()
+SKIP_IF_NO_OLLAMA = pytest.mark.skipif(_SHOULD_SKIP_OLLAMA, reason=_OLLAMA_REASON)
+
+
+def ollama_skip_reason():
+    """Why Ollama tests are disabled for this run (None if they run); see databases_skip_reason."""
+    return (_OLLAMA_REASON or "Ollama tests disabled") if _SHOULD_SKIP_OLLAMA else None
+
+
+@lru_cache(maxsize=None)
+def skip_if_no_ollama(model=None):
+    """
+    Decorator to skip tests if Ollama is not available.
+    With model, also skips when the server is up but that model isn't pulled.
+    Without a model this is just SKIP_IF_NO_OLLAMA (kept for existing callers).
+    Cached: one marker per model, shared by every test that asks for it.
+    """
+    if _SHOULD_SKIP_OLLAMA or not model:
+        return SKIP_IF_NO_OLLAMA
+    name = model if ":" in model else f"{model}:latest"
+    available = _available_models()
+    missing = available is not None and name not in available
+    return pytest.mark.skipif(missing, reason=f"Ollama model {name} not pulled")
+
+
+# Service health, probed at most once per pytest run (first probe_services() call).
+# name -> (ok, human-readable status line)
+SERVICE_STATUS = {}
+
+
+PROBE_TIMEOUT = 1
+
+
+def probe_tcp(name, url, default_port):
+    """
+    Plain TCP connect to the service's host:port: enough to know whether the
+    tests can reach it, without an HTTP request or a Mongo handshake.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme.endswith("+srv"):
+        # mongodb+srv: host comes from DNS SRV records; leave it to the driver
+        return True, f"{name} ({url}): ⏭️ Not probed (SRV URI)"
+    # multi-host URIs (mongodb://a:27017,b:27017/...): probe the first host only
+    first = urlparse("//" + parsed.netloc.rpartition("@")[2].split(",")[0])
+    try:
+        host, port = first.hostname or "localhost", first.port or default_port
+    except ValueError:
+        return True, f"{name} ({url}): ⏭️ Not probed (unparsed host/port)"
+    try:
+        socket.create_connection((host, port), timeout=PROBE_TIMEOUT).close()
+        return True, f"{name} ({url}): ✅ Reachable"
+    except OSError as e:
+        return False, f"{name} ({url}): ❌ Connection error - {e}"
+
+
+def probe_services():
+    """
+    Run the Qdrant/Mongo/Ollama probes (plus Qdrant's gRPC port when QDRANT_PREFER_GRPC
+    is on) concurrently, once; results are kept in SERVICE_STATUS.
+    """
+    if not SERVICE_STATUS:
+        settings = get_settings()
+        probes = {
+            "qdrant": ("Qdrant", settings.qdrant_url, 6333),
+            "mongo": ("MongoDB", settings.mongo_uri, 27017),
+            "ollama": ("Ollama", get_worker_ollama_host() or settings.ollama_host, 11434),
+        }
+        if settings.qdrant_prefer_grpc:
+            # the qdrant_client fixture then talks gRPC, which has its own port
+            grpc_host = urlparse(settings.qdrant_url).hostname or "localhost"
+            probes["qdrant_grpc"] = ("Qdrant gRPC", f"grpc://{grpc_host}:{settings.qdrant_grpc_port}",
+                                     settings.qdrant_grpc_port)
+        with ThreadPoolExecutor(max_workers=len(probes)) as ex:
+            futures = {key: ex.submit(probe_tcp, *args) for key, args in probes.items()}
+            SERVICE_STATUS.update({key: f.result() for key, f in futures.items()})
+    return SERVICE_STATUS
+
+
+# databases explicitly disabled via empty URLs (read once at import)
+_DB_SKIP: Final[bool] = os.environ.get("MONGO_URI") == "" or os.environ.get("QDRANT_URL") == ""
+
+
+def databases_skip_reason():
+    """Why database tests can't run (None if they can). Probes on first call, not at import."""
+    if _DB_SKIP:
+        return "Database URLs explicitly disabled"
+    status = probe_services()
+    down = [name for name in ("mongo", "qdrant", "qdrant_grpc") if name in status and not status[name][0]]
+    return f"Databases not reachable: {', '.join(down)}" if down else None
+
+
+# use as @SKIP_IF_NO_DATABASES: a plain marker, resolved per test by the
+# conftest pytest_runtest_setup hook, so importing this module never probes
+SKIP_IF_NO_DATABASES = pytest.mark.databases
 
 
 def skip_if_no_databases():
-    """Decorator to skip tests if databases are not available."""
-    db_config = get_database_config()
-    # For tests, we use default localhost URLs, so no need to skip
-    # unless explicitly set to empty
-    mongo_empty = os.environ.get("MONGO_URI", None) == ""
-    qdrant_empty = os.environ.get("QDRANT_URL", None) == ""
-    
-    should_skip = mongo_empty or qdrant_empty
-    reason = "Database URLs explicitly disabled"
-    
-    return pytest.mark.skipif(should_skip, reason=reason)
+    """Deprecated: decorate with SKIP_IF_NO_DATABASES instead (this returns the same marker)."""
+    return SKIP_IF_NO_DATABASES
 
 
 def get_test_database_config():
-    """Get database configuration for tests."""
-    return get_database_config()
+    """Get database configuration for tests (a fresh copy of the cached settings)."""
+    return dict(_cached_db_config())
 
 
-# Common fixtures
-@pytest.fixture(scope="module")
-def setup_prompts():
-    """Set up prompts directory for tests."""
-    return setup_test_environment()
+# Common fixtures (setup_prompts lives in conftest.py: autouse, once per session)
+# default "standard" test config, built once; the fixture hands out mutable copies
+_FROZEN_DEFAULT = frozen_test_model_config()
 
 
 @pytest.fixture
 def test_model_config():
     """Provide standard test model configuration."""
-    return get_test_model_config()
+    return {**_FROZEN_DEFAULT, "options": dict(_FROZEN_DEFAULT["options"])}
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_db_config():
-    """Provide test database configuration."""
-    return get_test_database_config()
\ No newline at end of file
+    """Provide test database configuration (read-only: shared by every test in the session)."""
+    return _cached_db_config()
\ No newline at end of file